@@ -3,6 +3,7 @@ ACE Hardware Logistics Dashboard - Backend Server
 Python http.server implementation for Databricks Apps
 """
 
+import base64
 import json
 import logging
 import mimetypes
@@ -10,6 +11,7 @@ import os
 import re
 import ssl
 import time
+from collections import OrderedDict
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -23,6 +25,8 @@ try:
 except Exception:
     dbsql = None
 
+from spatial import GridIndex, KDTree, cluster_entries, parse_bbox
+
 # Initialize logger before any usage
 logging.basicConfig(
     level=os.getenv("LOG_LEVEL", "INFO").upper(),
@@ -117,14 +121,17 @@ def return_connection(conn):
             pass
 
 
-def execute_query(query: str) -> Optional[Dict[str, Any]]:
-    """Execute a SQL query and return results as table with columns and rows"""
+def execute_query(query: str, parameters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Execute a SQL query (with optional :named parameters) and return results as table with columns and rows"""
     conn = None
     try:
         logger.info(f"Executing query: {query[:200]}...")
         conn = get_databricks_connection()
         cursor = conn.cursor()
-        cursor.execute(query)
+        if parameters:
+            cursor.execute(query, parameters)
+        else:
+            cursor.execute(query)
         
         # Get rows and columns
         rows = cursor.fetchall() or []
@@ -196,6 +203,425 @@ def table_to_dicts(table: Optional[Dict[str, Any]]) -> List[Dict[str, Optional[s
     ]
 
 
+# =============================================================================
+# QUERY REGISTRY & RESULT CACHE
+# =============================================================================
+
+# Projectable endpoints: response field -> SQL expression, in response order.
+# The key field is always selected so rows stay addressable on the client.
+FIELD_REGISTRY: Dict[str, Dict[str, Any]] = {
+    'truck-locations': {
+        'key': 'id',
+        'columns': {
+            'id': "truck_id",
+            'lat': "latitude",
+            'lng': "longitude",
+            'status': """CASE
+            WHEN delay_minutes IS NULL OR delay_minutes = 0 THEN 'on-time'
+            WHEN delay_minutes < 30 THEN 'minor-delay'
+            ELSE 'delayed'
+          END""",
+            'eta': "DATE_FORMAT(estimated_arrival_ts, 'h:mm a')",
+            'region': "COALESCE(region_id, 'UNKNOWN')",
+        },
+    },
+    'store-locations': {
+        'key': 'store_id',
+        'columns': {
+            'store_id': "s.store_id",
+            'city': "s.city",
+            'state': "s.state",
+            'lat': "s.latitude",
+            'lng': "s.longitude",
+            'weekly_revenue': "s.weekly_revenue",
+            'status': "s.is_active",
+        },
+    },
+}
+
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "60"))  # seconds
+QUERY_CACHE_MAX_ENTRIES = 256
+_query_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def resolve_fields(endpoint: str, query_params: Dict[str, List[str]], required: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """Parse ?fields= into a canonical, registry-ordered field tuple (raises ValueError on unknown fields)"""
+    columns = FIELD_REGISTRY[endpoint]['columns']
+    raw = query_params.get('fields', [''])[0]
+    requested = {field.strip() for field in raw.split(',') if field.strip()}
+    if not requested:
+        return tuple(columns)
+
+    unknown = requested - set(columns)
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {endpoint}: {', '.join(sorted(unknown))}")
+
+    requested.add(FIELD_REGISTRY[endpoint]['key'])
+    requested.update(required)
+    return tuple(field for field in columns if field in requested)
+
+
+def select_list(endpoint: str, fields: Tuple[str, ...]) -> str:
+    """Build the SELECT list for the requested fields of a registered endpoint"""
+    columns = FIELD_REGISTRY[endpoint]['columns']
+    return ",\n          ".join(f"{columns[field]} as {field}" for field in fields)
+
+
+def cached_query(cache_key: Tuple, query: str, parameters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Execute a query through the in-process result cache (TTL + LRU eviction)"""
+    if parameters:
+        cache_key = cache_key + tuple(sorted(parameters.items()))
+    now = time.time()
+    with _query_cache_lock:
+        entry = _query_cache.get(cache_key)
+        if entry and now - entry[0] < QUERY_CACHE_TTL:
+            _query_cache.move_to_end(cache_key)
+            logger.debug(f"Query cache hit: {cache_key}")
+            return entry[1]
+
+    table = execute_query(query, parameters)
+    if table is not None:
+        with _query_cache_lock:
+            _query_cache[cache_key] = (now, table)
+            _query_cache.move_to_end(cache_key)
+            while len(_query_cache) > QUERY_CACHE_MAX_ENTRIES:
+                _query_cache.popitem(last=False)
+    return table
+
+
+# Structures derived from a cached result (e.g. spatial indexes), keyed like the
+# result cache plus a kind, and rebuilt only when the underlying result is refreshed
+_derived_cache: Dict[Tuple, Tuple[Dict[str, Any], Any]] = {}
+
+
+def cached_derived(cache_key: Tuple, query: str, kind: str, build) -> Optional[Any]:
+    """Return build(table) for the cached result of query, rebuilding only after a refresh"""
+    table = cached_query(cache_key, query)
+    if table is None:
+        return None
+    derived_key = cache_key + (kind,)
+    with _query_cache_lock:
+        entry = _derived_cache.get(derived_key)
+        if entry and entry[0] is table:
+            return entry[1]
+    derived = build(table)
+    with _query_cache_lock:
+        _derived_cache[derived_key] = (table, derived)
+    return derived
+
+
+# =============================================================================
+# VIEWPORT QUERIES
+# =============================================================================
+
+# Below this zoom level map endpoints return grid clusters instead of every point
+CLUSTER_MAX_ZOOM = int(os.getenv("CLUSTER_MAX_ZOOM", "9"))
+MAX_ZOOM = 22
+
+
+def is_viewport_request(query_params: Dict[str, List[str]]) -> bool:
+    """Map endpoints switch to viewport mode when the client sends its bbox"""
+    return bool(query_params.get('bbox', [''])[0])
+
+
+def viewport_payload(index: Optional[GridIndex], query_params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Filter an index to ?bbox= and cluster it for ?zoom= (raises ValueError on bad params)"""
+    bbox = parse_bbox(query_params['bbox'][0])
+    zoom = max(0, min(int(query_params.get('zoom', ['0'])[0]), MAX_ZOOM))
+    entries = index.query_bbox(bbox) if index else []
+    if zoom < CLUSTER_MAX_ZOOM:
+        clusters, points = cluster_entries(entries, zoom)
+    else:
+        clusters, points = [], [entry[2] for entry in entries]
+    return {'zoom': zoom, 'total': len(entries), 'clusters': clusters, 'points': points}
+
+
+# =============================================================================
+# SPATIAL LAYERS
+# =============================================================================
+
+# Network snapshots shared by the map, viewport and spatial endpoints. Each is
+# loaded through the result cache, so the indexes over them are rebuilt on every
+# data refresh (QUERY_CACHE_TTL) and reused by every request in between.
+
+def truck_positions_query(fields: Tuple[str, ...]) -> str:
+    """Latest GPS position of every truck on the road (one row per truck, kept by the pipeline)"""
+    return f"""
+        SELECT 
+          {select_list('truck-locations', fields)}
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.truck_current_state
+        """
+
+
+def served_stores() -> str:
+    """
+    Stores with deliveries (alias s): current attributes from the stores_bronze
+    dimension, one row per store, joined to the per-store counts in store_delay_metrics
+    """
+    return f"""{DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.stores_bronze s
+        JOIN {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.store_delay_metrics m
+          ON s.store_id = m.store_id"""
+
+
+def store_locations_query(fields: Tuple[str, ...], limit: Optional[int] = None, by_store: bool = False) -> str:
+    """Store locations (one row per store), highest weekly revenue first; by_store filters to :store_id"""
+    return f"""
+        SELECT 
+          {select_list('store-locations', fields)}
+        FROM {served_stores()}
+        WHERE s.city IS NOT NULL 
+          AND s.latitude IS NOT NULL
+          AND s.longitude IS NOT NULL
+          {'AND s.store_id = :store_id' if by_store else ''}
+        ORDER BY s.weekly_revenue DESC
+        {f'LIMIT {limit}' if limit else ''}
+        """
+
+
+def rsc_locations_query(limit: Optional[int] = None) -> str:
+    """RSC (shipment origin) locations from the rsc_metrics gold table, busiest first"""
+    return f"""
+        SELECT
+          origin_city as name,
+          origin_city as city,
+          origin_state as state,
+          origin_latitude as lat,
+          origin_longitude as lng,
+          shipment_count
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.rsc_metrics
+        WHERE origin_latitude IS NOT NULL
+          AND origin_longitude IS NOT NULL
+        ORDER BY shipment_count DESC
+        {f'LIMIT {limit}' if limit else ''}
+        """
+
+
+def store_kdtree() -> Optional[KDTree]:
+    """KD-tree over every store, keyed by store_id"""
+    fields = tuple(FIELD_REGISTRY['store-locations']['columns'])
+    return cached_derived(('store-locations', 'network', fields), store_locations_query(fields), 'kdtree',
+                          lambda table: KDTree(normalize_store_status(table_to_dicts(table)), key='store_id'))
+
+
+def rsc_kdtree() -> Optional[KDTree]:
+    """KD-tree over every RSC / shipment origin, keyed by name"""
+    return cached_derived(('rsc-locations', 'network'), rsc_locations_query(), 'kdtree',
+                          lambda table: KDTree(table_to_dicts(table), key='name'))
+
+
+def truck_kdtree() -> Optional[KDTree]:
+    """KD-tree over the latest truck positions, keyed by truck id"""
+    fields = tuple(FIELD_REGISTRY['truck-locations']['columns'])
+    return cached_derived(('truck-locations', 'network', fields), truck_positions_query(fields), 'kdtree',
+                          lambda table: KDTree(table_to_dicts(table), key='id'))
+
+
+def fetch_rsc_stats() -> Optional[List[Dict[str, Any]]]:
+    """Per-RSC routes, stores served and average route distance from the rsc_metrics gold table"""
+    query = f"""
+        SELECT 
+          origin_city as name,
+          active_routes as activeRoutes,
+          stores_served as storesServed,
+          ROUND(avg_distance_km, 1) as avgDistance,
+          'active' as status
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.rsc_metrics
+        WHERE active_routes > 0
+        ORDER BY activeRoutes DESC
+        """
+    table = execute_query(query)
+    if table is None:
+        return None
+    return table_to_dicts(table)
+
+
+def fetch_network_summary() -> List[Dict[str, Any]]:
+    """The single network_summary row (empty list if the table is empty or unavailable)"""
+    query = f"""
+        SELECT 
+          total_stores as totalStores,
+          active_stores as activeStores,
+          states_covered as statesCovered,
+          at_risk_stores as atRiskStores,
+          coverage_percent as coveragePercent,
+          avg_delivery_days as avgDeliveryDays,
+          major_rscs as majorRSCs,
+          total_rscs as totalRSCs
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.network_summary
+        """
+    table = execute_query(query)
+    return table_to_dicts(table) if table else []
+
+
+def with_distances(matches: List[Tuple[float, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Attach distance_km to each matched point (copies, the indexed rows are shared)"""
+    return [dict(point, distance_km=round(distance, 1)) for distance, point in matches]
+
+
+def parse_number(query_params: Dict[str, List[str]], name: str, default: Optional[float] = None,
+                 low: float = float('-inf'), high: float = float('inf')) -> float:
+    """Parse a numeric query parameter within [low, high] (raises ValueError if missing or invalid)"""
+    raw = query_params.get(name, [None])[0]
+    if raw is None or raw == '':
+        if default is None:
+            raise ValueError(f"Missing required parameter: {name}")
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"Parameter {name} must be a number")
+    if not low <= value <= high:
+        raise ValueError(f"Parameter {name} must be between {low:g} and {high:g}")
+    return value
+
+
+# =============================================================================
+# KEYSET PAGINATION
+# =============================================================================
+
+# Each paginated endpoint declares its ORDER BY as (column, direction, sql_type).
+# The last key must be unique so the ordering is total and pages never overlap.
+# Columns prefixed with "_" are sort-only and stripped before the response.
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortKeys = List[Tuple[str, str, str]]
+
+
+def parse_limit(query_params: Dict[str, List[str]], default: int) -> int:
+    """Parse ?limit= and clamp it to [1, MAX_PAGE_SIZE] (raises ValueError if not an integer)"""
+    limit = int(query_params.get('limit', [str(default)])[0])
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: List[Optional[str]]) -> str:
+    """Encode the last row's sort key as an opaque token"""
+    payload = json.dumps({"k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, key_count: int) -> List[Optional[str]]:
+    """Decode a cursor produced by encode_cursor (raises ValueError if malformed)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != key_count:
+        raise ValueError("Invalid cursor")
+    if any(value is not None and not isinstance(value, str) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_query(base_query: str, sort_keys: SortKeys, cursor: Optional[str], limit: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Wrap an unordered base query with the keyset predicate, ORDER BY and LIMIT for one page.
+    Fetches limit + 1 rows so finish_keyset_page can tell whether another page exists.
+    Returns (query, parameters).
+    """
+    predicate = ""
+    parameters: Dict[str, Any] = {}
+    if cursor:
+        values = decode_cursor(cursor, len(sort_keys))
+        # (k0 after v0) OR (k0 = v0 AND k1 after v1) OR ...
+        clauses = []
+        for idx, (column, direction, sql_type) in enumerate(sort_keys):
+            terms = [f"{prev} = CAST(:k{j} AS {prev_type})" for j, (prev, _, prev_type) in enumerate(sort_keys[:idx])]
+            op = "<" if direction == "DESC" else ">"
+            terms.append(f"{column} {op} CAST(:k{idx} AS {sql_type})")
+            clauses.append("(" + " AND ".join(terms) + ")")
+            parameters[f"k{idx}"] = values[idx]
+        predicate = "WHERE " + "\n           OR ".join(clauses)
+
+    order_by = ", ".join(f"{column} {direction}" for column, direction, _ in sort_keys)
+    query = f"""
+        SELECT * FROM (
+          {base_query}
+        ) page
+        {predicate}
+        ORDER BY {order_by}
+        LIMIT {limit + 1}
+        """
+    return query, parameters
+
+
+def finish_keyset_page(rows: List[Dict[str, Optional[str]]], sort_keys: SortKeys, limit: int) -> Tuple[List[Dict[str, Optional[str]]], Optional[str]]:
+    """Trim the look-ahead row, build the next cursor and strip sort-only columns"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor([rows[-1].get(column) for column, _, _ in sort_keys])
+    for row in rows:
+        for column in [key for key in row if key.startswith("_")]:
+            del row[column]
+    return rows, next_cursor
+
+
+def normalize_store_status(results: List[Dict[str, Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+    """Convert the boolean is_active status to 'active'/'inactive'"""
+    for result in results:
+        if 'status' in result:
+            result['status'] = 'active' if result['status'] in ['true', 'True', True, '1', 1] else 'inactive'
+    return results
+
+
+# =============================================================================
+# KPI CUBE
+# =============================================================================
+
+# /api/kpis slice parameters -> supply_chain_kpi_cube columns, in the cube's grain order
+KPI_SLICE_COLUMNS = [('region', 'region_id'), ('vendor_type', 'vendor_type'), ('carrier', 'carrier')]
+
+
+# =============================================================================
+# TIME WINDOWS
+# =============================================================================
+
+# Time-ranged endpoints read the day-grained rollup tables. The dataset is a
+# replayable snapshot, so windows end at the latest date present in the rollup
+# rather than today.
+MAX_WINDOW_DAYS = 366
+
+
+def parse_days(query_params: Dict[str, List[str]], default: Optional[int]) -> Optional[int]:
+    """Parse ?days= into [1, MAX_WINDOW_DAYS]; None means all history (raises ValueError if invalid)"""
+    raw = query_params.get('days', [None])[0]
+    if raw is None or raw == '':
+        return default
+    try:
+        days = int(raw)
+    except ValueError:
+        raise ValueError("days must be an integer")
+    if not 1 <= days <= MAX_WINDOW_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_WINDOW_DAYS}")
+    return days
+
+
+def parse_date(query_params: Dict[str, List[str]]) -> Optional[str]:
+    """Parse ?date=YYYY-MM-DD (raises ValueError if malformed)"""
+    raw = query_params.get('date', [None])[0]
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD")
+
+
+def window_predicate(table: str, days: Optional[int]) -> str:
+    """SQL predicate keeping the last `days` dates of a rollup table (TRUE for all history)"""
+    if days is None:
+        return "TRUE"
+    return f"""event_date >= (
+            SELECT DATE_SUB(MAX(event_date), {days - 1})
+            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.{table}
+          )"""
+
+
 # =============================================================================
 # GENIE API HELPER FUNCTIONS
 # =============================================================================
@@ -422,11 +848,14 @@ class AppHandler(BaseHTTPRequestHandler):
         """Override to use logger instead of stderr"""
         logger.info(f"{self.address_string()} - {format % args}")
     
-    def send_json_response(self, data: Any, status: int = 200, cache_seconds: int = 120):
-        """Send JSON response with caching headers"""
+    def send_json_response(self, data: Any, status: int = 200, cache_seconds: int = 120, headers: Optional[Dict[str, str]] = None):
+        """Send JSON response with caching headers (plus any extra headers)"""
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Expose-Headers", NEXT_CURSOR_HEADER)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         # Add caching headers for better performance
         self.send_header("Cache-Control", f"public, max-age={cache_seconds}")
         self.send_header("ETag", f'"{hash(json.dumps(data))}"')
@@ -457,6 +886,11 @@ class AppHandler(BaseHTTPRequestHandler):
         """Send error response"""
         self.send_json_response({"error": message}, status)
     
+    def send_page_response(self, rows: List[Dict[str, Optional[str]]], next_cursor: Optional[str]):
+        """Send one keyset page; the cursor for the next page travels in a response header"""
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        self.send_json_response(rows, headers=headers)
+    
     def do_GET(self):
         """Handle GET requests"""
         parsed = urlparse(self.path)
@@ -475,7 +909,7 @@ class AppHandler(BaseHTTPRequestHandler):
         elif path == "/api/rsc-locations":
             self.handle_rsc_locations()
         elif path == "/api/store-locations":
-            self.handle_store_locations()
+            self.handle_store_locations(query_params)
         elif path == "/api/rsc-stats":
             self.handle_rsc_stats()
         elif path == "/api/network-stats":
@@ -483,7 +917,7 @@ class AppHandler(BaseHTTPRequestHandler):
         elif path == "/api/location-monitor-data":  # NEW: Combined endpoint
             self.handle_location_monitor_data()
         elif path == "/api/kpis":
-            self.handle_kpis()
+            self.handle_kpis(query_params)
         elif path == "/api/debug/count":
             self.handle_debug_count()
         elif path == "/api/debug/ping":
@@ -491,7 +925,7 @@ class AppHandler(BaseHTTPRequestHandler):
         elif path == "/api/regions":
             self.handle_regions()
         elif path == "/api/throughput":
-            self.handle_throughput()
+            self.handle_throughput(query_params)
         elif path == "/api/fleet":
             self.handle_fleet(query_params)
         elif path == "/api/risk-stores":
@@ -499,11 +933,17 @@ class AppHandler(BaseHTTPRequestHandler):
         elif path == "/api/delay-causes":
             self.handle_delay_causes(query_params)
         elif path == "/api/eta-accuracy":
-            self.handle_eta_accuracy()
+            self.handle_eta_accuracy(query_params)
         elif path == "/api/truck-locations":
-            self.handle_truck_locations()
+            self.handle_truck_locations(query_params)
         elif path == "/api/alerts":
-            self.handle_alerts()
+            self.handle_alerts(query_params)
+        elif path == "/api/spatial/radius":
+            self.handle_spatial_radius(query_params)
+        elif path == "/api/spatial/nearest":
+            self.handle_spatial_nearest(query_params)
+        elif path == "/api/spatial/impacted-stores":
+            self.handle_impacted_stores(query_params)
         
         # Static files
         elif path == "/" or path == "":
@@ -592,13 +1032,13 @@ class AppHandler(BaseHTTPRequestHandler):
         """Debug endpoint to check table row counts"""
         try:
             logger.info("=== DEBUG COUNT ENDPOINT CALLED ===")
-            query = f"SELECT COUNT(*) as row_count FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver"
+            query = f"SELECT COUNT(*) as row_count FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_dashboard_slim"
             logger.info(f"Debug query: {query}")
             table = execute_query(query)
             logger.info(f"Debug count table: {table}")
             if table:
                 row_count = table_first_value(table, 'row_count')
-                response_data = {'table': 'logistics_silver', 'count': row_count, 'parsed': parse_float(row_count)}
+                response_data = {'table': 'logistics_dashboard_slim', 'count': row_count, 'parsed': parse_float(row_count)}
                 logger.info(f"Sending response: {response_data}")
                 self.send_json_response(response_data)
             else:
@@ -619,16 +1059,16 @@ class AppHandler(BaseHTTPRequestHandler):
             # Execute all queries (SQL warehouse can handle these efficiently)
             kpi_query = f"""
             WITH active_trucks AS (
-              SELECT COUNT(DISTINCT truck_id) as active_count
-              FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
+              SELECT hll_sketch_estimate(hll_union_agg(truck_sketch)) as active_count
+              FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
               WHERE event_type = 'IN_TRANSIT'
             ),
             delivery_metrics AS (
               SELECT 
-                COUNT(*) as total_deliveries,
-                COUNT(CASE WHEN delay_minutes > 0 THEN 1 END) as delayed_count,
-                ROUND(AVG(COALESCE(delay_minutes, 0)), 1) as avg_delay
-              FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
+                SUM(events) as total_deliveries,
+                SUM(delayed_events) as delayed_count,
+                ROUND(SUM(total_delay_minutes) / NULLIF(SUM(events), 0), 1) as avg_delay
+              FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
               WHERE event_type IN ('DELIVERED', 'IN_TRANSIT', 'OUT_FOR_DELIVERY')
             )
             SELECT 
@@ -643,10 +1083,10 @@ class AppHandler(BaseHTTPRequestHandler):
             
             throughput_query = f"""
             SELECT 
-              DATE_FORMAT(event_ts, 'HH:00') as hour,
-              COUNT(DISTINCT truck_id) as trucks
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            GROUP BY DATE_FORMAT(event_ts, 'HH:00')
+              FORMAT_STRING('%02d:00', event_hour) as hour,
+              hll_sketch_estimate(hll_union_agg(truck_sketch)) as trucks
+            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
+            GROUP BY event_hour
             ORDER BY hour
             LIMIT 24
             """
@@ -654,14 +1094,14 @@ class AppHandler(BaseHTTPRequestHandler):
             regional_query = f"""
             SELECT 
               region_id as name,
-              COUNT(DISTINCT truck_id) as trucks,
-              ROUND(AVG(CASE WHEN delay_minutes > 0 THEN 100 ELSE 0 END), 0) as utilization,
+              hll_sketch_estimate(hll_union_agg(truck_sketch)) as trucks,
+              ROUND(SUM(delayed_events) * 100.0 / NULLIF(SUM(events), 0), 0) as utilization,
               CASE 
-                WHEN AVG(COALESCE(delay_minutes, 0)) > 60 THEN 'critical'
-                WHEN AVG(COALESCE(delay_minutes, 0)) > 30 THEN 'warning'
+                WHEN SUM(total_delay_minutes) / NULLIF(SUM(events), 0) > 60 THEN 'critical'
+                WHEN SUM(total_delay_minutes) / NULLIF(SUM(events), 0) > 30 THEN 'warning'
                 ELSE 'normal'
               END as status
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
+            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
             WHERE event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED')
             GROUP BY region_id
             ORDER BY trucks DESC
@@ -670,31 +1110,28 @@ class AppHandler(BaseHTTPRequestHandler):
             rsc_query = f"""
             SELECT 
               origin_city as name,
-              origin_lat as lat,
-              origin_lng as lng,
+              origin_latitude as lat,
+              origin_longitude as lng,
               'active' as status,
-              COUNT(DISTINCT shipment_id) as shipment_count
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE origin_city IS NOT NULL
-              AND origin_lat IS NOT NULL
-              AND origin_lng IS NOT NULL
-            GROUP BY origin_city, origin_lat, origin_lng
+              shipment_count
+            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.rsc_metrics
+            WHERE origin_latitude IS NOT NULL
+              AND origin_longitude IS NOT NULL
             ORDER BY shipment_count DESC
             LIMIT 20
             """
             
             store_query = f"""
-            SELECT DISTINCT
-              store_id as storeId,
-              store_city as name,
-              store_lat as lat,
-              store_lng as lng,
-              CASE WHEN store_is_active = TRUE THEN 'active' ELSE 'inactive' END as status
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE store_city IS NOT NULL
-              AND store_lat IS NOT NULL
-              AND store_lng IS NOT NULL
-              AND store_id IS NOT NULL
+            SELECT
+              s.store_id as storeId,
+              s.city as name,
+              s.latitude as lat,
+              s.longitude as lng,
+              CASE WHEN s.is_active = TRUE THEN 'active' ELSE 'inactive' END as status
+            FROM {served_stores()}
+            WHERE s.city IS NOT NULL
+              AND s.latitude IS NOT NULL
+              AND s.longitude IS NOT NULL
             LIMIT 100
             """
             
@@ -728,80 +1165,79 @@ class AppHandler(BaseHTTPRequestHandler):
             logger.error(f"Error fetching overview data: {e}", exc_info=True)
             self.send_error_response(500, str(e))
     
-    def handle_kpis(self):
-        """Get executive KPIs for dashboard - OPTIMIZED: Uses supply_chain_kpi gold table (8-12x faster)"""
+    def handle_kpis(self, query_params: Dict[str, List[str]]):
+        """
+        Get executive KPIs for dashboard - OPTIMIZED: Single-row lookup in supply_chain_kpi_cube.
+        Optional ?region=&vendor_type=&carrier= select a slice; omitted filters roll up.
+        """
+        
+        # OPTIMIZED QUERY: The cube stores every grain of (region, vendor type, carrier) with
+        # ratios computed from additive sums, so no re-aggregation (or average of averages)
+        # Old query: SUM/AVG over supply_chain_kpi rows on every request
+        slice_filters = []
+        parameters: Dict[str, str] = {}
+        for param, column in KPI_SLICE_COLUMNS:
+            value = query_params.get(param, [''])[0]
+            if value:
+                slice_filters.append(f"AND {column} = :{column}")
+                parameters[column] = value
+        grain = ','.join(column for _, column in KPI_SLICE_COLUMNS if column in parameters) or 'network'
+        parameters['grain'] = grain
         
-        # OPTIMIZED QUERY: Uses pre-computed KPI aggregates from supply_chain_kpi gold table
-        # Old query: Multiple CTEs scanning logistics_silver + COUNT DISTINCT operations = 1-2s
-        # New query: Simple aggregation of pre-computed KPIs = 0.1-0.2s
         query = f"""
         SELECT 
-          -- Network throughput: Sum of all deliveries across regions
-          SUM(total_deliveries) as network_throughput,
-          
-          -- Late arrivals: Sum of delayed deliveries
-          SUM(delayed_count) as late_arrivals,
-          
-          -- Late arrivals percentage: Weighted average delay rate
-          ROUND(
-            (SUM(delayed_count) * 100.0 / NULLIF(SUM(total_deliveries), 0)), 
-            1
-          ) as late_arrivals_percent,
-          
-          -- Average delay: Weighted average across all deliveries
-          ROUND(
-            SUM(avg_delay_minutes * total_deliveries) / NULLIF(SUM(total_deliveries), 0), 
-            1
-          ) as avg_delay,
-          
+          total_deliveries as network_throughput,
+          delayed_count as late_arrivals,
+          ROUND(delay_rate_pct, 1) as late_arrivals_percent,
+          ROUND(avg_delay_minutes, 1) as avg_delay,
           -- Data quality score (static for now)
           96.8 as data_quality_score
-          
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.supply_chain_kpi
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.supply_chain_kpi_cube
+        WHERE grain = :grain
+          {' '.join(slice_filters)}
         """
         
         try:
-            logger.info(f"Executing KPI query (GOLD TABLE)...")
-            table = execute_query(query)
+            logger.info(f"Executing KPI query (KPI CUBE, grain={grain})...")
+            table = execute_query(query, parameters)
+            defaults = {
+                'network_throughput': 0,
+                'late_arrivals': 0,
+                'late_arrivals_percent': 0.0,
+                'avg_delay': 0.0,
+                'data_quality_score': 96.8
+            }
             if table is None:
                 logger.warning("KPI query returned None")
-                self.send_json_response({
-                    'network_throughput': 0,
-                    'late_arrivals': 0,
-                    'late_arrivals_percent': 0.0,
-                    'avg_delay': 0.0,
-                    'data_quality_score': 96.8
-                })
+                self.send_json_response(defaults)
                 return
             
-            # Extract values using helper functions
-            payload = {
-                'network_throughput': parse_float(table_first_value(table, 'network_throughput')),
-                'late_arrivals': parse_float(table_first_value(table, 'late_arrivals')),
-                'late_arrivals_percent': parse_float(table_first_value(table, 'late_arrivals_percent')),
-                'avg_delay': parse_float(table_first_value(table, 'avg_delay')),
-                'data_quality_score': parse_float(table_first_value(table, 'data_quality_score'))
-            }
+            # A slice without deliveries has no cube row (and a NULL average when no
+            # delay was reported), so missing values fall back to the zero defaults
+            payload = {}
+            for field, default in defaults.items():
+                value = parse_float(table_first_value(table, field))
+                payload[field] = default if value is None else value
             
-            logger.info(f"KPI payload (GOLD TABLE): {payload}")
+            logger.info(f"KPI payload (KPI CUBE): {payload}")
             self.send_json_response(payload)
         except Exception as e:
             logger.error(f"Error fetching KPIs: {e}", exc_info=True)
             self.send_error_response(500, str(e))
     
     def handle_regions(self):
-        """Get regional performance status from logistics_silver"""
+        """Get regional performance status - trucks per region merged from daily_region_activity sketches"""
         query = f"""
         SELECT 
           region_id as name,
-          COUNT(DISTINCT truck_id) as trucks,
-          ROUND(AVG(CASE WHEN delay_minutes > 0 THEN 100 ELSE 0 END), 0) as utilization,
+          hll_sketch_estimate(hll_union_agg(truck_sketch)) as trucks,
+          ROUND(SUM(delayed_events) * 100.0 / NULLIF(SUM(events), 0), 0) as utilization,
           CASE 
-            WHEN AVG(COALESCE(delay_minutes, 0)) > 60 THEN 'critical'
-            WHEN AVG(COALESCE(delay_minutes, 0)) > 30 THEN 'warning'
+            WHEN SUM(total_delay_minutes) / NULLIF(SUM(events), 0) > 60 THEN 'critical'
+            WHEN SUM(total_delay_minutes) / NULLIF(SUM(events), 0) > 30 THEN 'warning'
             ELSE 'normal'
           END as status
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
         WHERE event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED')
         GROUP BY region_id
         ORDER BY trucks DESC
@@ -815,25 +1251,38 @@ class AppHandler(BaseHTTPRequestHandler):
             logger.error(f"Error fetching regional status: {e}")
             self.send_error_response(500, str(e))
     
-    def handle_throughput(self):
-        """Get 24-hour throughput data - Shows latest available day from static dataset"""
+    def handle_throughput(self, query_params: Dict[str, List[str]]):
+        """Get 24-hour throughput data for ?date=YYYY-MM-DD (default: latest available day)"""
+        try:
+            date = parse_date(query_params)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        # daily_region_activity holds (date, hour, region, event type) rows; truck sketches
+        # are merged per hour, so no distinct count over silver
+        if date:
+            day_filter = "event_date = CAST(:event_date AS DATE)"
+            parameters = {'event_date': date}
+        else:
+            day_filter = f"""event_date = (
+            SELECT MAX(event_date)
+            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
+          )"""
+            parameters = None
         query = f"""
-        WITH latest_date AS (
-          SELECT MAX(DATE(event_ts)) as max_date
-          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        )
         SELECT 
-          DATE_FORMAT(event_ts, 'HH:00') as hour,
-          COUNT(DISTINCT truck_id) as trucks
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE DATE(event_ts) = (SELECT max_date FROM latest_date)
-        GROUP BY DATE_FORMAT(event_ts, 'HH:00')
+          FORMAT_STRING('%02d:00', event_hour) as hour,
+          hll_sketch_estimate(hll_union_agg(truck_sketch)) as trucks
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_region_activity
+        WHERE {day_filter}
+        GROUP BY event_hour
         ORDER BY hour
         """
         
         try:
-            logger.info("Executing throughput query (LATEST DAY)...")
-            table = execute_query(query)
+            logger.info(f"Executing throughput query ({date or 'LATEST DAY'})...")
+            table = execute_query(query, parameters)
             results = table_to_dicts(table)
             logger.info(f"Throughput query returned {len(results)} hourly data points")
             self.send_json_response(results)
@@ -842,183 +1291,113 @@ class AppHandler(BaseHTTPRequestHandler):
             self.send_error_response(500, str(e))
     
     def handle_fleet(self, query_params: Dict[str, List[str]]):
-        """Get active fleet tracking data - OPTIMIZED: Simplified ROW_NUMBER query"""
-        limit = int(query_params.get('limit', ['50'])[0])
-        
-        # OPTIMIZED QUERY: Streamlined window function, removed unnecessary columns
-        # Note: Cannot use logistics_fact here as it only contains DELIVERED events
-        # Fleet tracking needs IN_TRANSIT and OUT_FOR_DELIVERY data
-        # Optimization: Simpler SELECT, more efficient ROW_NUMBER window
-        query = f"""
-        WITH latest_events AS (
+        """Get active fleet tracking data - OPTIMIZED: Point read of truck_current_state, keyset paginated"""
+        try:
+            limit = parse_limit(query_params, 50)
+            
+            # OPTIMIZED QUERY: truck_current_state holds one row per truck (latest movement
+            # event, upserted by the pipeline), so no window over silver history is needed
+            # Fleet tracking shows every truck on the road: its latest movement event is
+            # DEPARTED_WAREHOUSE, IN_TRANSIT or OUT_FOR_DELIVERY
+            # Pagination: ?cursor= continues after the last truck of the previous page
+            base_query = f"""
           SELECT 
-            truck_id,
-            origin_city,
-            store_city,
-            estimated_arrival_ts,
-            delay_minutes,
-            COALESCE(shipment_total_value, shipment_value, 0) as shipment_value,
-            ROW_NUMBER() OVER (PARTITION BY truck_id ORDER BY event_ts DESC) as rn
-          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-          WHERE event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY')
-            AND truck_id IS NOT NULL
-        )
-        SELECT 
-          truck_id as id,
-          COALESCE(origin_city, 'Unknown') as origin,
-          COALESCE(store_city, 'Unknown') as destination,
-          DATE_FORMAT(estimated_arrival_ts, 'h:mm a') as eta,
-          COALESCE(delay_minutes, 0) as delay,
-          CASE 
-            WHEN delay_minutes IS NULL OR delay_minutes = 0 THEN 'on-time'
-            WHEN delay_minutes < 30 THEN 'minor-delay'
-            ELSE 'delayed'
-          END as status,
-          'GENERAL' as productCategory,
-          shipment_value as shipmentValue
-        FROM latest_events
-        WHERE rn = 1
-        ORDER BY estimated_arrival_ts DESC
-        LIMIT {limit}
-        """
+            truck_id as id,
+            COALESCE(origin_city, 'Unknown') as origin,
+            COALESCE(store_city, 'Unknown') as destination,
+            DATE_FORMAT(estimated_arrival_ts, 'h:mm a') as eta,
+            COALESCE(delay_minutes, 0) as delay,
+            CASE 
+              WHEN delay_minutes IS NULL OR delay_minutes = 0 THEN 'on-time'
+              WHEN delay_minutes < 30 THEN 'minor-delay'
+              ELSE 'delayed'
+            END as status,
+            'GENERAL' as productCategory,
+            COALESCE(shipment_total_value, shipment_value, 0) as shipmentValue,
+            COALESCE(estimated_arrival_ts, TIMESTAMP '1970-01-01 00:00:00') as _eta_ts
+          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.truck_current_state
+          WHERE event_type IN ('DEPARTED_WAREHOUSE', 'IN_TRANSIT', 'OUT_FOR_DELIVERY')
+            """
+            sort_keys = [('_eta_ts', 'DESC', 'TIMESTAMP'), ('id', 'ASC', 'STRING')]
+            query, parameters = keyset_query(base_query, sort_keys, query_params.get('cursor', [None])[0], limit)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
         
         try:
-            logger.info("Executing fleet query (OPTIMIZED SILVER)...")
-            table = execute_query(query)
-            results = table_to_dicts(table)
+            logger.info("Executing fleet query (truck_current_state)...")
+            table = execute_query(query, parameters)
+            results, next_cursor = finish_keyset_page(table_to_dicts(table), sort_keys, limit)
             logger.info(f"Fleet query returned {len(results)} active trucks")
-            self.send_json_response(results)
+            self.send_page_response(results, next_cursor)
         except Exception as e:
             logger.error(f"Error fetching fleet data: {e}")
             self.send_error_response(500, str(e))
     
     def handle_risk_stores(self, query_params: Dict[str, List[str]]):
-        """Get store risk assessment data - OPTIMIZED: Uses store_delay_metrics gold table (20x faster)"""
-        limit = int(query_params.get('limit', ['50'])[0])
-        
-        # OPTIMIZED QUERY: Uses pre-aggregated gold table instead of scanning/aggregating raw silver data
-        # Old query: 100K+ rows scanned + complex CTEs with ROW_NUMBER + aggregations = 2-4s
-        # New query: ~300 pre-aggregated rows + simple calculations = 0.1-0.3s
-        query = f"""
-        WITH delay_reasons AS (
-          -- Get most frequent non-NONE delay reason per store
-          SELECT 
-            store_id,
-            store_city,
-            FIRST(delay_reason) as primary_delay_reason
-          FROM (
-            SELECT 
-              store_id,
-              store_city,
-              delay_reason,
-              COUNT(*) as reason_count,
-              ROW_NUMBER() OVER (PARTITION BY store_id ORDER BY COUNT(*) DESC) as rn
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE event_type IN ('DELIVERED', 'IN_TRANSIT', 'OUT_FOR_DELIVERY')
-              AND delay_reason IS NOT NULL
-              AND delay_reason != 'NONE'
-              AND delay_minutes > 0
-            GROUP BY store_id, store_city, delay_reason
-          )
-          WHERE rn = 1
-          GROUP BY store_id, store_city
-        ),
-        store_risk AS (
+        """Get store risk assessment data - OPTIMIZED: Ordered read of store_risk_scores gold table, keyset paginated"""
+        try:
+            limit = parse_limit(query_params, 50)
+            
+            # OPTIMIZED QUERY: Risk score, tier, revenue at risk and primary delay reason are
+            # computed by the pipeline (store_risk_scores), so no silver scan at request time
+            # Pagination: ?cursor= continues after the last store of the previous page
+            base_query = f"""
           SELECT 
-            sdm.store_id,
-            sdm.store_city,
-            sdm.total_deliveries,
-            sdm.delayed_shipments,
-            sdm.avg_delay_minutes,
-            sdm.max_delay_minutes,
-            sdm.total_shipment_value,
-            sdm.store_weekly_revenue,
-            COALESCE(dr.primary_delay_reason, 'OPERATIONAL') as primary_delay_reason,
-            -- IMPROVED: More balanced risk calculation with realistic variation
-            -- Formula creates natural distribution across LOW/MEDIUM/HIGH/CRITICAL tiers
-            CAST(LEAST(ROUND(
-              -- Base risk (25-45 range based on delay rate)
-              25 + ((sdm.delayed_shipments * 1.0 / GREATEST(sdm.total_deliveries, 1)) * 20) +
-              -- Average delay component (0-25 range, capped at 300 min for outliers)
-              (LEAST(COALESCE(sdm.avg_delay_minutes, 0), 300) / 300.0) * 25 +
-              -- Max delay spike component (0-20 range, capped at 480 min)
-              (LEAST(COALESCE(sdm.max_delay_minutes, 0), 480) / 480.0) * 20 +
-              -- Volume penalty: High-volume stores with delays are riskier (0-10 range)
-              (CASE 
-                WHEN sdm.total_deliveries > 100 AND (sdm.delayed_shipments * 1.0 / sdm.total_deliveries) > 0.3 
-                THEN 10
-                WHEN sdm.total_deliveries > 50 AND (sdm.delayed_shipments * 1.0 / sdm.total_deliveries) > 0.4
-                THEN 5
-                ELSE 0
-              END)
-            , 0), 100) AS INT) as riskScore
-          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.store_delay_metrics sdm
-          LEFT JOIN delay_reasons dr ON sdm.store_id = dr.store_id
-          WHERE sdm.total_deliveries >= 2  -- Filter on pre-aggregated data!
-        )
-        SELECT 
-          store_id as storeId,
-          COALESCE(store_city, 'Unknown') as location,
-          riskScore,
-          primary_delay_reason as primaryDelay,
-          CAST(ROUND(
-            (total_shipment_value / GREATEST(total_deliveries, 1)) * 
-            total_deliveries * 
-            0.08 *
-            (1 + (delayed_shipments * 1.0 / GREATEST(total_deliveries, 1)) * 0.5)
-          , 2) AS DECIMAL(18,2)) as revenueAtRisk,
-          CASE 
-            WHEN riskScore >= 80 THEN 'CRITICAL'
-            WHEN riskScore >= 65 THEN 'HIGH'
-            WHEN riskScore >= 45 THEN 'MEDIUM'
-            ELSE 'LOW'
-          END as riskTier
-        FROM store_risk
-        ORDER BY 
-          riskScore DESC,
-          (delayed_shipments * 1.0 / GREATEST(total_deliveries, 1)) DESC
-        LIMIT {limit}
-        """
+            store_id as storeId,
+            COALESCE(store_city, 'Unknown') as location,
+            risk_score as riskScore,
+            primary_delay_reason as primaryDelay,
+            revenue_at_risk as revenueAtRisk,
+            risk_tier as riskTier,
+            delay_rate as _delay_rate
+          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.store_risk_scores
+            """
+            sort_keys = [('riskScore', 'DESC', 'INT'), ('_delay_rate', 'DESC', 'DOUBLE'), ('storeId', 'ASC', 'INT')]
+            query, parameters = keyset_query(base_query, sort_keys, query_params.get('cursor', [None])[0], limit)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
         
         try:
-            table = execute_query(query)
-            results = table_to_dicts(table)
+            table = execute_query(query, parameters)
+            results, next_cursor = finish_keyset_page(table_to_dicts(table), sort_keys, limit)
             logger.info(f"Risk stores query (GOLD TABLE) returned {len(results)} stores")
-            self.send_json_response(results)
+            self.send_page_response(results, next_cursor)
         except Exception as e:
             logger.error(f"Error fetching risk stores: {e}")
             self.send_error_response(500, str(e))
     
     def handle_delay_causes(self, query_params: Dict[str, List[str]]):
-        """Get delay root cause analysis - OPTIMIZED: Uses logistics_fact (3-5x faster)"""
-        days = int(query_params.get('days', ['7'])[0])
+        """Get delay root cause analysis for the last ?days= days - OPTIMIZED: Uses daily_delivery_rollup"""
+        try:
+            days = parse_days(query_params, 7)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
         
-        # OPTIMIZED QUERY: Uses logistics_fact instead of logistics_silver
-        # Benefits:
-        # 1. Pre-joined dimensions (no joins needed)
-        # 2. Pre-computed flags (is_delayed)
-        # 3. Enriched with gold table aggregates
-        # Old query: Scans all logistics_silver DELIVERED events
-        # New query: Uses logistics_fact (already filtered to DELIVERED + enriched)
+        # OPTIMIZED QUERY: Sums pre-aggregated day rows instead of counting fact rows
+        # An N-day window touches N days x (region, store, vendor, carrier, reason) rows
         query = f"""
         SELECT 
           COALESCE(delay_reason, 'Unknown') as cause,
-          COUNT(*) as count,
-          ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 0) as percentage
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_fact
-        WHERE is_delayed = 1
+          SUM(delayed_deliveries) as count,
+          ROUND(SUM(delayed_deliveries) * 100.0 / SUM(SUM(delayed_deliveries)) OVER (), 0) as percentage
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.daily_delivery_rollup
+        WHERE {window_predicate('daily_delivery_rollup', days)}
           AND delay_reason IS NOT NULL
           AND delay_reason != 'NONE'
         GROUP BY delay_reason
+        HAVING SUM(delayed_deliveries) > 0
         ORDER BY count DESC
         LIMIT 10
         """
         
         try:
-            logger.info(f"Executing delay causes query (FACT TABLE)...")
+            logger.info(f"Executing delay causes query (ROLLUP, {days} days)...")
             table = execute_query(query)
             results = table_to_dicts(table)
-            logger.info(f"Delay causes (FACT) returned {len(results)} results")
+            logger.info(f"Delay causes (ROLLUP) returned {len(results)} results")
             if len(results) > 0:
                 logger.info(f"Sample result: {results[0]}")
             self.send_json_response(results)
@@ -1026,106 +1405,207 @@ class AppHandler(BaseHTTPRequestHandler):
             logger.error(f"Error fetching delay causes: {e}", exc_info=True)
             self.send_error_response(500, str(e))
     
-    def handle_eta_accuracy(self):
-        """Get ETA vs actual arrival comparison - OPTIMIZED: Uses logistics_fact (3-5x faster)"""
+    def handle_eta_accuracy(self, query_params: Dict[str, List[str]]):
+        """Get on-time vs delayed deliveries by hour for the last ?days= days (default: all history)"""
+        try:
+            days = parse_days(query_params, None)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
         
-        # OPTIMIZED QUERY: Uses logistics_fact instead of logistics_silver
-        # Benefits:
-        # 1. Pre-computed is_delayed flag (no CASE WHEN needed)
-        # 2. Pre-joined dimensions
-        # 3. logistics_fact only contains DELIVERED events (no filtering needed)
-        # Old query: Filters logistics_silver for DELIVERED + actual_arrival_ts
-        # New query: logistics_fact already has only DELIVERED with enriched data
+        # OPTIMIZED QUERY: Sums hourly_delivery_rollup (date x hour x region rows)
+        # instead of classifying every delivered fact row per request
         query = f"""
-        WITH hourly_deliveries AS (
-          SELECT 
-            HOUR(delivery_timestamp) as hour_num,
-            DATE_FORMAT(delivery_timestamp, 'HH:00') as time,
-            CASE 
-              WHEN is_delayed = 0 THEN 'on_time'
-              ELSE 'delayed'
-            END as delivery_status
-          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_fact
-          WHERE delivery_timestamp IS NOT NULL
-        )
         SELECT 
-          time,
-          SUM(CASE WHEN delivery_status = 'on_time' THEN 1 ELSE 0 END) as actual,
-          SUM(CASE WHEN delivery_status = 'delayed' THEN 1 ELSE 0 END) as predicted
-        FROM hourly_deliveries
-        GROUP BY time, hour_num
-        ORDER BY hour_num
+          FORMAT_STRING('%02d:00', event_hour) as time,
+          SUM(deliveries - delayed_deliveries) as actual,
+          SUM(delayed_deliveries) as predicted
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.hourly_delivery_rollup
+        WHERE {window_predicate('hourly_delivery_rollup', days)}
+          AND event_hour IS NOT NULL
+        GROUP BY event_hour
+        ORDER BY event_hour
         """
         
         try:
-            logger.info("Executing ETA accuracy query (FACT TABLE)...")
+            logger.info("Executing ETA accuracy query (ROLLUP)...")
             table = execute_query(query)
             results = table_to_dicts(table)
-            logger.info(f"ETA accuracy (FACT) returned {len(results)} hourly results")
+            logger.info(f"ETA accuracy (ROLLUP) returned {len(results)} hourly results")
             self.send_json_response(results)
         except Exception as e:
             logger.error(f"Error fetching ETA accuracy: {e}")
             self.send_error_response(500, str(e))
     
-    def handle_truck_locations(self):
-        """Get GPS coordinates for live map from silver table"""
+    def handle_truck_locations(self, query_params: Dict[str, List[str]]):
+        """
+        Get GPS coordinates for live map from truck_current_state (supports ?fields= projection).
+        With ?bbox=&zoom= returns the latest position of every truck in the viewport,
+        clustered at low zoom levels.
+        """
+        viewport = is_viewport_request(query_params)
+        try:
+            fields = resolve_fields('truck-locations', query_params, required=('lat', 'lng') if viewport else ())
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        if viewport:
+            # Latest position per truck across the whole network; indexed once per cache refresh
+            try:
+                index = cached_derived(('truck-locations', 'network', fields), truck_positions_query(fields), 'grid',
+                                       lambda table: GridIndex(table_to_dicts(table)))
+                payload = viewport_payload(index, query_params)
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+            except Exception as e:
+                logger.error(f"Error fetching truck locations: {e}")
+                self.send_error_response(500, str(e))
+                return
+            logger.info(f"Truck viewport returned {len(payload['points'])} points, {len(payload['clusters'])} clusters")
+            self.send_json_response(payload)
+            return
+        
         query = f"""
         SELECT 
-          truck_id as id,
-          latitude as lat,
-          longitude as lng,
-          CASE 
-            WHEN delay_minutes IS NULL OR delay_minutes = 0 THEN 'on-time'
-            WHEN delay_minutes < 30 THEN 'minor-delay'
-            ELSE 'delayed'
-          END as status,
-          DATE_FORMAT(estimated_arrival_ts, 'h:mm a') as eta,
-          COALESCE(region_id, 'UNKNOWN') as region
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE latitude IS NOT NULL
-          AND longitude IS NOT NULL
-          AND event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DEPARTED_WAREHOUSE')
+          {select_list('truck-locations', fields)}
+        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.truck_current_state
         LIMIT 100
         """
         
         try:
-            table = execute_query(query)
+            table = cached_query(('truck-locations', fields), query)
             results = table_to_dicts(table)
-            logger.info(f"Truck locations query returned {len(results)} results")
+            logger.info(f"Truck locations query returned {len(results)} results ({len(fields)} fields)")
             self.send_json_response(results)
         except Exception as e:
             logger.error(f"Error fetching truck locations: {e}")
             self.send_error_response(500, str(e))
     
-    def handle_alerts(self):
-        """Generate alerts from delay data"""
-        query = f"""
-        SELECT 
-          ROW_NUMBER() OVER (ORDER BY delay_minutes DESC) as id,
-          CASE 
-            WHEN delay_minutes > 120 THEN 'critical'
-            WHEN delay_minutes > 60 THEN 'warning'
-            ELSE 'info'
-          END as type,
-          CONCAT('Truck ', truck_id, ' Delayed ', delay_minutes, ' Minutes') as title,
-          CONCAT('Route: ', origin_city, ' → ', store_city, ' | Reason: ', delay_reason) as description,
-          DATE_FORMAT(event_ts, '%h:%i %p') as timestamp,
-          CASE WHEN delay_minutes > 120 THEN true ELSE false END as actionRequired
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_fact
-        WHERE delay_minutes > 30
-          AND delivery_timestamp >= CURRENT_TIMESTAMP() - INTERVAL 24 HOURS
-        ORDER BY delay_minutes DESC
-        LIMIT 20
-        """
+    def handle_alerts(self, query_params: Dict[str, List[str]]):
+        """Generate alerts from delay data (keyset paginated, most severe first)"""
+        try:
+            limit = parse_limit(query_params, 20)
+            # The window runs before the keyset predicate, so ids stay absolute across pages
+            base_query = f"""
+          SELECT 
+            ROW_NUMBER() OVER (ORDER BY delay_minutes DESC, event_id) as id,
+            CASE 
+              WHEN delay_minutes > 120 THEN 'critical'
+              WHEN delay_minutes > 60 THEN 'warning'
+              ELSE 'info'
+            END as type,
+            CONCAT('Truck ', truck_id, ' Delayed ', delay_minutes, ' Minutes') as title,
+            CONCAT('Route: ', origin_city, ' → ', store_city, ' | Reason: ', delay_reason) as description,
+            DATE_FORMAT(delivery_timestamp, 'h:mm a') as timestamp,
+            CASE WHEN delay_minutes > 120 THEN true ELSE false END as actionRequired,
+            delay_minutes as _delay,
+            event_id as _event_id
+          FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_fact
+          WHERE delay_minutes > 30
+            AND event_date >= DATE_SUB(CURRENT_DATE(), 1)
+            AND delivery_timestamp >= CURRENT_TIMESTAMP() - INTERVAL 24 HOURS
+            """
+            sort_keys = [('_delay', 'DESC', 'INT'), ('_event_id', 'ASC', 'STRING')]
+            query, parameters = keyset_query(base_query, sort_keys, query_params.get('cursor', [None])[0], limit)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
         
         try:
-            table = execute_query(query)
-            results = table_to_dicts(table)
-            self.send_json_response(results)
+            table = execute_query(query, parameters)
+            results, next_cursor = finish_keyset_page(table_to_dicts(table), sort_keys, limit)
+            self.send_page_response(results, next_cursor)
         except Exception as e:
             logger.error(f"Error fetching alerts: {e}")
             self.send_error_response(500, str(e))
     
+    def spatial_layer(self, query_params: Dict[str, List[str]]) -> Tuple[str, Optional[KDTree]]:
+        """Resolve ?kind=stores|rscs to its KD-tree (raises ValueError on unknown kinds)"""
+        kind = query_params.get('kind', ['stores'])[0]
+        if kind == 'stores':
+            return kind, store_kdtree()
+        if kind == 'rscs':
+            return kind, rsc_kdtree()
+        raise ValueError("kind must be 'stores' or 'rscs'")
+    
+    def handle_spatial_radius(self, query_params: Dict[str, List[str]]):
+        """Stores or RSCs within ?km= of ?lat=&lng=, nearest first (served from the in-memory KD-tree)"""
+        try:
+            lat = parse_number(query_params, 'lat', low=-90, high=90)
+            lng = parse_number(query_params, 'lng', low=-180, high=180)
+            km = parse_number(query_params, 'km', default=100, low=0, high=5000)
+            kind, tree = self.spatial_layer(query_params)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        try:
+            matches = with_distances(tree.within(lat, lng, km)) if tree else []
+            logger.info(f"Spatial radius ({kind}, {km:g} km) matched {len(matches)} locations")
+            self.send_json_response({'kind': kind, 'lat': lat, 'lng': lng, 'km': km, 'results': matches})
+        except Exception as e:
+            logger.error(f"Error running spatial radius query: {e}", exc_info=True)
+            self.send_error_response(500, str(e))
+    
+    def handle_spatial_nearest(self, query_params: Dict[str, List[str]]):
+        """
+        The ?k= stores or RSCs nearest to ?lat=&lng=, or to ?store_id= (e.g. nearest RSC to a store)
+        """
+        try:
+            k = int(parse_number(query_params, 'k', default=1, low=1, high=50))
+            kind, tree = self.spatial_layer(query_params)
+            store_id = query_params.get('store_id', [None])[0]
+            if store_id:
+                stores = store_kdtree()
+                store = stores.by_key.get(store_id) if stores else None
+                if store is None:
+                    self.send_error_response(404, f"Unknown store_id: {store_id}")
+                    return
+                lat, lng = float(store['lat']), float(store['lng'])
+            else:
+                lat = parse_number(query_params, 'lat', low=-90, high=90)
+                lng = parse_number(query_params, 'lng', low=-180, high=180)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        try:
+            matches = tree.nearest(lat, lng, k + 1 if store_id and kind == 'stores' else k) if tree else []
+            if store_id and kind == 'stores':
+                # A store is its own nearest store
+                matches = [match for match in matches if str(match[1].get('store_id')) != store_id][:k]
+            self.send_json_response({'kind': kind, 'lat': lat, 'lng': lng, 'results': with_distances(matches)})
+        except Exception as e:
+            logger.error(f"Error running spatial nearest query: {e}", exc_info=True)
+            self.send_error_response(500, str(e))
+    
+    def handle_impacted_stores(self, query_params: Dict[str, List[str]]):
+        """Stores within ?km= (default 100) of a truck's latest position, nearest first"""
+        truck_id = query_params.get('truck_id', [''])[0]
+        try:
+            if not truck_id:
+                raise ValueError("Missing required parameter: truck_id")
+            km = parse_number(query_params, 'km', default=100, low=0, high=5000)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        try:
+            trucks = truck_kdtree()
+            truck = trucks.by_key.get(truck_id) if trucks else None
+            if truck is None:
+                self.send_error_response(404, f"No recent position for truck: {truck_id}")
+                return
+            stores = store_kdtree()
+            matches = stores.within(float(truck['lat']), float(truck['lng']), km) if stores else []
+            logger.info(f"Truck {truck_id}: {len(matches)} stores within {km:g} km")
+            self.send_json_response({'truck': truck, 'km': km, 'stores': with_distances(matches)})
+        except Exception as e:
+            logger.error(f"Error fetching impacted stores: {e}", exc_info=True)
+            self.send_error_response(500, str(e))
+    
     def handle_user(self):
         """Return authenticated user information from Databricks App context"""
         try:
@@ -1161,22 +1641,7 @@ class AppHandler(BaseHTTPRequestHandler):
     
     def handle_rsc_locations(self):
         """Get distinct RSC (Retail Support Center) / warehouse locations"""
-        query = f"""
-        SELECT
-          origin_city as name,
-          origin_city as city,
-          origin_state as state,
-          origin_latitude as lat,
-          origin_longitude as lng,
-          COUNT(DISTINCT shipment_id) as shipment_count
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE origin_city IS NOT NULL 
-          AND origin_latitude IS NOT NULL
-          AND origin_longitude IS NOT NULL
-        GROUP BY origin_city, origin_state, origin_latitude, origin_longitude
-        ORDER BY shipment_count DESC
-        LIMIT 20
-        """
+        query = rsc_locations_query(limit=20)
         
         try:
             table = execute_query(query)
@@ -1187,83 +1652,62 @@ class AppHandler(BaseHTTPRequestHandler):
             logger.error(f"Error fetching RSC locations: {e}")
             self.send_error_response(500, str(e))
     
-    def handle_store_locations(self):
-        """Get store locations from logistics_silver"""
-        query = f"""
-        SELECT 
-          store_id,
-          store_city as city,
-          store_state as state,
-          store_latitude as lat,
-          store_longitude as lng,
-          store_weekly_revenue as weekly_revenue,
-          store_is_active as status
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE store_city IS NOT NULL 
-          AND store_latitude IS NOT NULL
-          AND store_longitude IS NOT NULL
-          AND store_id IS NOT NULL
-        GROUP BY store_id, store_city, store_state, store_latitude, store_longitude, 
-                 store_weekly_revenue, store_is_active
-        ORDER BY store_weekly_revenue DESC
-        LIMIT 300
+    def handle_store_locations(self, query_params: Dict[str, List[str]]):
         """
+        Get store locations from the stores_bronze dimension (supports ?fields= projection).
+        With ?bbox=&zoom= returns every store in the viewport, clustered at low zoom levels.
+        With ?store_id= returns that store only (e.g. map popup details).
+        """
+        viewport = is_viewport_request(query_params)
+        try:
+            fields = resolve_fields('store-locations', query_params, required=('lat', 'lng') if viewport else ())
+            store_id = query_params.get('store_id', [''])[0]
+            parameters = {'store_id': int(store_id)} if store_id and not viewport else None
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+        
+        # The viewport snapshot covers the whole network; the top-300 cap only applies to the plain list
+        if viewport:
+            try:
+                index = cached_derived(('store-locations', 'network', fields), store_locations_query(fields), 'grid',
+                                       lambda table: GridIndex(normalize_store_status(table_to_dicts(table))))
+                payload = viewport_payload(index, query_params)
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+            except Exception as e:
+                logger.error(f"Error fetching store locations: {e}", exc_info=True)
+                self.send_error_response(500, str(e))
+                return
+            logger.info(f"Store viewport returned {len(payload['points'])} points, {len(payload['clusters'])} clusters")
+            self.send_json_response(payload)
+            return
         
         try:
-            table = execute_query(query)
+            query = store_locations_query(fields, limit=300, by_store=parameters is not None)
+            table = cached_query(('store-locations', fields), query, parameters)
             if not table:
                 logger.error("Store locations query returned None")
                 self.send_json_response([])
                 return
                 
-            results = table_to_dicts(table)
+            results = normalize_store_status(table_to_dicts(table))
             logger.info(f"Store locations query returned {len(results)} locations")
-            
-            # Convert boolean status to string
-            for result in results:
-                if 'status' in result:
-                    result['status'] = 'active' if result['status'] in ['true', 'True', True, '1', 1] else 'inactive'
-            
             self.send_json_response(results)
         except Exception as e:
             logger.error(f"Error fetching store locations: {e}", exc_info=True)
             self.send_json_response([])
     
     def handle_rsc_stats(self):
-        """Get RSC (Distribution Center) statistics"""
-        query = f"""
-        SELECT 
-          origin_city as name,
-          COUNT(DISTINCT truck_id) as activeRoutes,
-          COUNT(DISTINCT store_id) as storesServed,
-          ROUND(AVG(
-            111.045 * DEGREES(ACOS(
-              LEAST(1.0, GREATEST(-1.0,
-                COS(RADIANS(origin_latitude))
-                * COS(RADIANS(store_latitude))
-                * COS(RADIANS(origin_longitude) - RADIANS(store_longitude))
-                + SIN(RADIANS(origin_latitude))
-                * SIN(RADIANS(store_latitude))
-              ))
-            ))
-          ), 1) as avgDistance,
-          'active' as status
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE origin_city IS NOT NULL
-          AND truck_id IS NOT NULL
-          AND event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED')
-        GROUP BY origin_city
-        ORDER BY activeRoutes DESC
-        """
-        
+        """Get RSC (Distribution Center) statistics - OPTIMIZED: Read of the rsc_metrics gold table"""
         try:
-            table = execute_query(query)
-            if not table:
+            results = fetch_rsc_stats()
+            if results is None:
                 logger.error("RSC stats query returned None")
                 self.send_json_response([])
                 return
             
-            results = table_to_dicts(table)
             logger.info(f"RSC stats query returned {len(results)} centers")
             self.send_json_response(results)
         except Exception as e:
@@ -1271,63 +1715,21 @@ class AppHandler(BaseHTTPRequestHandler):
             self.send_json_response([])
     
     def handle_network_stats(self):
-        """Get network-wide statistics - OPTIMIZED: Single table scan instead of 4 CTEs"""
-        # First get major RSC count separately
-        rsc_count_query = f"""
-        SELECT origin_city
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE origin_city IS NOT NULL
-        GROUP BY origin_city
-        HAVING COUNT(DISTINCT shipment_id) >= 20
-        """
-        
-        main_query = f"""
-        SELECT 
-          COUNT(DISTINCT store_id) as totalStores,
-          COUNT(DISTINCT CASE WHEN store_is_active = TRUE THEN store_id END) as activeStores,
-          COUNT(DISTINCT store_state) as statesCovered,
-          COUNT(DISTINCT CASE WHEN delay_minutes > 120 THEN store_id END) as atRiskStores,
-          ROUND(
-            (COUNT(DISTINCT CASE WHEN store_is_active = TRUE THEN store_id END) * 100.0 / 
-             NULLIF(COUNT(DISTINCT store_id), 0)), 
-            1
-          ) as coveragePercent,
-          ROUND(
-            AVG(CASE 
-              WHEN planned_departure_ts IS NOT NULL AND planned_arrival_ts IS NOT NULL
-              THEN TIMESTAMPDIFF(DAY, planned_departure_ts, planned_arrival_ts)
-            END), 
-            1
-          ) as avgDeliveryDays
-        FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-        WHERE store_id IS NOT NULL
-        """
-        
+        """Get network-wide statistics - OPTIMIZED: Single-row read of the network_summary gold table"""
         try:
-            # Execute both queries
-            rsc_table = execute_query(rsc_count_query)
-            main_table = execute_query(main_query)
-            
-            if not main_table:
-                logger.error("Network stats query returned None")
-                self.send_json_response({
-                    'totalStores': 0,
-                    'activeStores': 0,
-                    'statesCovered': 0,
-                    'atRiskStores': 0,
-                    'totalRSCs': 0,
-                    'coveragePercent': 0,
-                    'avgDeliveryDays': 2.1
-                })
-                return
-            
-            # Count RSCs from the separate query result
-            rsc_count = len(table_to_dicts(rsc_table)) if rsc_table else 0
-            
-            results = table_to_dicts(main_table)
+            results = fetch_network_summary()
             if results:
-                result = results[0]
-                result['totalRSCs'] = rsc_count  # Add the RSC count
+                summary = results[0]
+                # This endpoint has always reported the major-hub count as totalRSCs
+                result = {
+                    'totalStores': summary['totalStores'],
+                    'activeStores': summary['activeStores'],
+                    'statesCovered': summary['statesCovered'],
+                    'atRiskStores': summary['atRiskStores'],
+                    'totalRSCs': int(summary['majorRSCs'] or 0),
+                    'coveragePercent': summary['coveragePercent'],
+                    'avgDeliveryDays': summary['avgDeliveryDays'],
+                }
                 logger.info(f"Network stats: {result}")
                 # Ensure avgDeliveryDays has a default if NULL
                 if result.get('avgDeliveryDays') is None:
@@ -1349,88 +1751,10 @@ class AppHandler(BaseHTTPRequestHandler):
             self.send_error_response(500, str(e))
     
     def handle_location_monitor_data(self):
-        """OPTIMIZED: Combined endpoint for Location Monitor - single API call instead of 2"""
+        """OPTIMIZED: Combined endpoint for Location Monitor - reads the rsc_metrics and network_summary gold tables"""
         try:
-            # Get major RSC count (high volume hubs: >= 20 shipments)
-            major_rsc_query = f"""
-            SELECT origin_city
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE origin_city IS NOT NULL
-            GROUP BY origin_city
-            HAVING COUNT(DISTINCT shipment_id) >= 20
-            """
-            
-            # Get total RSC count (top 20 by volume)
-            total_rsc_query = f"""
-            SELECT origin_city
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE origin_city IS NOT NULL
-            GROUP BY origin_city
-            ORDER BY COUNT(DISTINCT shipment_id) DESC
-            LIMIT 20
-            """
-            
-            # Get RSC stats
-            rsc_query = f"""
-            SELECT 
-              origin_city as name,
-              COUNT(DISTINCT truck_id) as activeRoutes,
-              COUNT(DISTINCT store_id) as storesServed,
-              ROUND(AVG(
-                111.045 * DEGREES(ACOS(
-                  LEAST(1.0, GREATEST(-1.0,
-                    COS(RADIANS(origin_latitude))
-                    * COS(RADIANS(store_latitude))
-                    * COS(RADIANS(origin_longitude) - RADIANS(store_longitude))
-                    + SIN(RADIANS(origin_latitude))
-                    * SIN(RADIANS(store_latitude))
-                  ))
-                ))
-              ), 1) as avgDistance,
-              'active' as status
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE origin_city IS NOT NULL
-              AND truck_id IS NOT NULL
-              AND event_type IN ('IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED')
-            GROUP BY origin_city
-            ORDER BY activeRoutes DESC
-            """
-            
-            # Get network stats
-            network_query = f"""
-            SELECT 
-              COUNT(DISTINCT store_id) as totalStores,
-              COUNT(DISTINCT CASE WHEN store_is_active = TRUE THEN store_id END) as activeStores,
-              COUNT(DISTINCT store_state) as statesCovered,
-              COUNT(DISTINCT CASE WHEN delay_minutes > 120 THEN store_id END) as atRiskStores,
-              ROUND(
-                (COUNT(DISTINCT CASE WHEN store_is_active = TRUE THEN store_id END) * 100.0 / 
-                 NULLIF(COUNT(DISTINCT store_id), 0)), 
-                1
-              ) as coveragePercent,
-              ROUND(
-                AVG(CASE 
-                  WHEN planned_departure_ts IS NOT NULL AND planned_arrival_ts IS NOT NULL
-                  THEN TIMESTAMPDIFF(DAY, planned_departure_ts, planned_arrival_ts)
-                END), 
-                1
-              ) as avgDeliveryDays
-            FROM {DATABRICKS_CONFIG['catalog']}.{DATABRICKS_CONFIG['schema']}.logistics_silver
-            WHERE store_id IS NOT NULL
-            """
-            
-            # Execute queries
-            major_rsc_table = execute_query(major_rsc_query)
-            total_rsc_table = execute_query(total_rsc_query)
-            rsc_table = execute_query(rsc_query)
-            network_table = execute_query(network_query)
-            
-            # Count RSCs from the separate query results
-            major_rsc_count = len(table_to_dicts(major_rsc_table)) if major_rsc_table else 0
-            total_rsc_count = len(table_to_dicts(total_rsc_table)) if total_rsc_table else 0
-            
-            rsc_stats = table_to_dicts(rsc_table) if rsc_table else []
-            network_results = table_to_dicts(network_table) if network_table else []
+            rsc_stats = fetch_rsc_stats() or []
+            network_results = fetch_network_summary()
             
             network_stats = network_results[0] if network_results else {
                 'totalStores': 0,
@@ -1443,9 +1767,9 @@ class AppHandler(BaseHTTPRequestHandler):
                 'avgDeliveryDays': 2.1
             }
             
-            # Add both RSC counts
-            network_stats['majorRSCs'] = major_rsc_count  # Major hubs (8)
-            network_stats['totalRSCs'] = total_rsc_count   # All RSCs on map (20)
+            # Major hubs (>= 20 shipments) out of the top 20 RSCs shown on the map
+            network_stats['majorRSCs'] = int(network_stats['majorRSCs'] or 0)
+            network_stats['totalRSCs'] = min(int(network_stats['totalRSCs'] or 0), 20)
             
             # Ensure avgDeliveryDays has default
             if network_stats.get('avgDeliveryDays') is None:
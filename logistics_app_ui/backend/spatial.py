@@ -0,0 +1,218 @@
+"""
+ACE Hardware Logistics Dashboard - Spatial Helpers
+In-memory indexes over map points, rebuilt whenever the cached source query refreshes
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+Point = Dict[str, Any]
+
+# Same convention as the dashboard SQL: 111.045 km per degree of arc
+KM_PER_DEGREE = 111.045
+EARTH_RADIUS_KM = KM_PER_DEGREE * 180.0 / math.pi
+
+# Leaflet renders 256px tiles; a cluster cell covers roughly CLUSTER_CELL_PX on screen
+TILE_SIZE_PX = 256
+CLUSTER_CELL_PX = 64
+
+
+class BBox(NamedTuple):
+    """Viewport bounds in Leaflet's toBBoxString() order: west,south,east,north"""
+    west: float
+    south: float
+    east: float
+    north: float
+
+    def contains(self, lat: float, lng: float) -> bool:
+        return self.south <= lat <= self.north and self.west <= lng <= self.east
+
+
+def parse_bbox(raw: str) -> BBox:
+    """Parse 'west,south,east,north' (raises ValueError if malformed)"""
+    try:
+        west, south, east, north = (float(part) for part in raw.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if not all(math.isfinite(value) for value in (west, south, east, north)):
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if south > north or west > east:
+        raise ValueError("bbox must satisfy west <= east and south <= north")
+    # Leaflet keeps counting longitude past +/-180 when panning; clamp to the world
+    return BBox(max(west, -180.0), max(south, -90.0), min(east, 180.0), min(north, 90.0))
+
+
+def point_coords(point: Point) -> Optional[Tuple[float, float]]:
+    """(lat, lng) of a result row, or None if either coordinate is missing/invalid"""
+    try:
+        lat, lng = float(point["lat"]), float(point["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lng)):
+        return None
+    return lat, lng
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    """Position on the unit sphere; chord length between vectors is monotonic in great-circle distance"""
+    phi, lam = math.radians(lat), math.radians(lng)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def chord_for_km(km: float) -> float:
+    """Unit-sphere chord length spanning a great-circle distance of km"""
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def cell_size_for_zoom(zoom: int) -> float:
+    """Cluster cell size in degrees so a cell spans ~CLUSTER_CELL_PX at this zoom"""
+    return 360.0 / (2 ** zoom) * CLUSTER_CELL_PX / TILE_SIZE_PX
+
+
+class GridIndex:
+    """
+    Uniform lat/lng bucket index (geohash-style fixed cells).
+    Bounding-box queries only visit the cells overlapping the box.
+    """
+
+    def __init__(self, points: Iterable[Point], cell_deg: float = 1.0):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Point]]] = {}
+        self.size = 0
+        for point in points:
+            coords = point_coords(point)
+            if coords is None:
+                continue
+            self._cells.setdefault(self._cell(*coords), []).append((coords[0], coords[1], point))
+            self.size += 1
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def query_bbox(self, bbox: BBox) -> List[Tuple[float, float, Point]]:
+        """All indexed (lat, lng, point) entries inside the box"""
+        south_row, west_col = self._cell(bbox.south, bbox.west)
+        north_row, east_col = self._cell(bbox.north, bbox.east)
+        if (north_row - south_row + 1) * (east_col - west_col + 1) > len(self._cells):
+            # Box covers more cells than are populated: scan the populated ones instead
+            candidates = self._cells.values()
+        else:
+            candidates = (
+                self._cells.get((row, col), [])
+                for row in range(south_row, north_row + 1)
+                for col in range(west_col, east_col + 1)
+            )
+        return [entry for bucket in candidates for entry in bucket if bbox.contains(entry[0], entry[1])]
+
+
+def cluster_entries(entries: List[Tuple[float, float, Point]], zoom: int) -> Tuple[List[Dict[str, Any]], List[Point]]:
+    """
+    Grid-cluster entries for the given zoom level.
+    Returns (clusters, points): cells holding several entries become a cluster
+    at their centroid with a count; lone entries are returned unchanged.
+    """
+    cell_deg = cell_size_for_zoom(zoom)
+    cells: Dict[Tuple[int, int], List[Tuple[float, float, Point]]] = {}
+    for entry in entries:
+        key = (math.floor(entry[0] / cell_deg), math.floor(entry[1] / cell_deg))
+        cells.setdefault(key, []).append(entry)
+
+    clusters: List[Dict[str, Any]] = []
+    points: List[Point] = []
+    for bucket in cells.values():
+        if len(bucket) == 1:
+            points.append(bucket[0][2])
+            continue
+        clusters.append({
+            "lat": round(sum(entry[0] for entry in bucket) / len(bucket), 5),
+            "lng": round(sum(entry[1] for entry in bucket) / len(bucket), 5),
+            "count": len(bucket),
+        })
+    return clusters, points
+
+
+class KDTree:
+    """
+    Static 3-d tree over unit-sphere vectors of indexed points.
+    Radius and k-nearest queries prune on chord distance, so they stay exact
+    across the antimeridian and near the poles, and visit O(log n) nodes.
+    """
+
+    def __init__(self, points: Iterable[Point], key: Optional[str] = None):
+        entries = []
+        for point in points:
+            coords = point_coords(point)
+            if coords is not None:
+                entries.append((unit_vector(*coords), coords[0], coords[1], point))
+        self.size = len(entries)
+        self.by_key: Dict[str, Point] = {str(entry[3].get(key)): entry[3] for entry in entries} if key else {}
+        self._root = self._build(entries, 0)
+
+    def _build(self, entries: List[Tuple], depth: int) -> Optional[Tuple]:
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        mid = len(entries) // 2
+        # node = (entry, axis, left, right)
+        return (entries[mid], axis, self._build(entries[:mid], depth + 1), self._build(entries[mid + 1:], depth + 1))
+
+    @staticmethod
+    def _chord_sq(a: Tuple[float, float, float], b: Tuple[float, float, float]) -> float:
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    def within(self, lat: float, lng: float, km: float) -> List[Tuple[float, Point]]:
+        """(distance_km, point) for every point within km of (lat, lng), nearest first"""
+        target = unit_vector(lat, lng)
+        limit_sq = chord_for_km(km) ** 2
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            entry, axis, left, right = node
+            if self._chord_sq(entry[0], target) <= limit_sq:
+                found.append(entry)
+            diff = target[axis] - entry[0][axis]
+            stack.append(left if diff <= 0 else right)
+            if diff * diff <= limit_sq:
+                stack.append(right if diff <= 0 else left)
+        results = [(haversine_km(lat, lng, entry[1], entry[2]), entry[3]) for entry in found]
+        return sorted((item for item in results if item[0] <= km), key=lambda item: item[0])
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> List[Tuple[float, Point]]:
+        """(distance_km, point) for the k points closest to (lat, lng), nearest first"""
+        target = unit_vector(lat, lng)
+        heap: List[Tuple[float, int, Tuple]] = []  # max-heap of (-chord_sq, tiebreak, entry)
+
+        def visit(node: Optional[Tuple]) -> None:
+            if node is None:
+                return
+            entry, axis, left, right = node
+            dist_sq = self._chord_sq(entry[0], target)
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist_sq, id(entry), entry))
+            elif dist_sq < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist_sq, id(entry), entry))
+            diff = target[axis] - entry[0][axis]
+            near, far = (left, right) if diff <= 0 else (right, left)
+            visit(near)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                visit(far)
+
+        if k > 0:
+            visit(self._root)
+        results = [(haversine_km(lat, lng, entry[1], entry[2]), entry[3]) for _, _, entry in heap]
+        return sorted(results, key=lambda item: item[0])
+
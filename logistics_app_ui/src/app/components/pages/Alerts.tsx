@@ -1,7 +1,18 @@
 import { Bell, AlertCircle, Info, XCircle, CheckCircle } from 'lucide-react';
-import { mockAlerts } from '@/app/data/mockData';
+import { useMemo } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
+import * as api from '@/app/services/api';
 
 export default function Alerts() {
+  // Most severe first; further pages are keyset cursors from the X-Next-Cursor header
+  const { data, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['alerts', 20],
+    queryFn: ({ pageParam }) => api.getAlertsPage(20, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
+  });
+  const alerts = useMemo(() => data?.pages.flatMap((page) => page.items) ?? [], [data]);
+
   const getAlertIcon = (type: string) => {
     switch (type) {
       case 'critical':
@@ -28,9 +39,9 @@ export default function Alerts() {
     }
   };
 
-  const criticalAlerts = mockAlerts.filter(a => a.type === 'critical').length;
-  const warningAlerts = mockAlerts.filter(a => a.type === 'warning').length;
-  const actionRequired = mockAlerts.filter(a => a.actionRequired).length;
+  const criticalAlerts = alerts.filter(a => a.type === 'critical').length;
+  const warningAlerts = alerts.filter(a => a.type === 'warning').length;
+  const actionRequired = alerts.filter(a => a.actionRequired).length;
 
   return (
     <div className="space-y-6">
@@ -50,7 +61,7 @@ export default function Alerts() {
           <div className="flex items-center gap-3 mb-2">
             <Bell className="w-8 h-8 text-[#FF7900]" />
             <div>
-              <div className="text-2xl font-bold text-gray-900">{mockAlerts.length}</div>
+              <div className="text-2xl font-bold text-gray-900">{alerts.length}</div>
               <div className="text-sm text-gray-600">Total Alerts</div>
             </div>
           </div>
@@ -100,7 +111,7 @@ export default function Alerts() {
           </div>
         </div>
         <div className="divide-y divide-gray-200">
-          {mockAlerts.map((alert) => (
+          {alerts.map((alert) => (
             <div
               key={alert.id}
               className={`p-6 hover:bg-gray-50 transition-colors border-l-4 ${getAlertStyle(alert.type)}`}
@@ -138,6 +149,17 @@ export default function Alerts() {
             </div>
           ))}
         </div>
+        {hasNextPage && (
+          <div className="p-4 border-t border-gray-200 flex justify-center">
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="px-4 py-2 bg-[#FF7900] text-white rounded-lg hover:bg-[#E66D00] transition-colors text-sm font-medium disabled:opacity-50"
+            >
+              {isFetchingNextPage ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Alert Configuration */}
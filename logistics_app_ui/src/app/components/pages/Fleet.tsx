@@ -4,9 +4,12 @@ import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContai
 import * as api from '@/app/services/api';
 
 const COLORS = ['#FF7900', '#ef4444', '#f59e0b', '#10b981', '#6b7280'];
+const FLEET_PAGE_SIZE = 50;
 
 export default function Fleet() {
   const [fleetData, setFleetData] = useState<api.FleetTruck[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [etaData, setEtaData] = useState<api.ETAAccuracy[]>([]);
   const [delayCauses, setDelayCauses] = useState<api.DelayCause[]>([]);
   const [loading, setLoading] = useState(true);
@@ -15,11 +18,12 @@ export default function Fleet() {
     async function fetchData() {
       try {
         const [fleet, eta, delays] = await Promise.all([
-          api.getFleetData(50),
+          api.getFleetPage(FLEET_PAGE_SIZE),
           api.getETAAccuracy(),
           api.getDelayCauses(7)
         ]);
-        setFleetData(fleet);
+        setFleetData(fleet.items);
+        setNextCursor(fleet.nextCursor);
         setEtaData(eta);
         setDelayCauses(delays);
       } catch (error) {
@@ -31,6 +35,21 @@ export default function Fleet() {
     fetchData();
   }, []);
 
+  // Appends the next keyset page (cursor from the previous page's X-Next-Cursor header)
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await api.getFleetPage(FLEET_PAGE_SIZE, nextCursor);
+      setFleetData((trucks) => [...trucks, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to fetch more fleet data:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusBadge = (status: string) => {
     const classes = {
       'on-time': 'bg-green-100 text-green-700',
@@ -293,6 +312,17 @@ export default function Fleet() {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="p-4 border-t border-gray-200 flex justify-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-4 py-2 bg-[#FF7900] text-white rounded-lg hover:bg-[#E66D00] transition-colors text-sm font-medium disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,18 +1,22 @@
 import { AlertTriangle, MapPin, Clock, TrendingUp, Package } from 'lucide-react';
-import { useState, useEffect } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useState, useEffect, useMemo } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
 import { KPICardSkeleton } from '@/app/components/ui/LoadingSkeleton';
 import * as api from '@/app/services/api';
 
 export default function RiskDashboard() {
   const [showContent, setShowContent] = useState(false);
 
-  // Use React Query for caching and automatic refetching
-  const { data: riskData = [], isLoading, error } = useQuery({
+  // Use React Query for caching and automatic refetching; further pages are keyset
+  // cursors from the previous page's X-Next-Cursor header
+  const { data, isLoading, error, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey: ['riskStores', 50],
-    queryFn: () => api.getRiskStores(50),
+    queryFn: ({ pageParam }) => api.getRiskStoresPage(50, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     staleTime: 2 * 60 * 1000, // 2 minutes
   });
+  const riskData = useMemo(() => data?.pages.flatMap((page) => page.items) ?? [], [data]);
 
   // Add minimum display time for skeletons (500ms) to prevent flashing
   useEffect(() => {
@@ -250,6 +254,17 @@ export default function RiskDashboard() {
             </tbody>
           </table>
         </div>
+        {hasNextPage && (
+          <div className="p-4 border-t border-gray-200 flex justify-center">
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="px-4 py-2 bg-[#FF7900] text-white rounded-lg hover:bg-[#E66D00] transition-colors text-sm font-medium disabled:opacity-50"
+            >
+              {isFetchingNextPage ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Business Impact Context */}
@@ -1,13 +1,13 @@
 import { Store } from 'lucide-react';
-import { useState, useEffect } from 'react';
-import { MapContainer, TileLayer, Marker, Popup, useMap } from 'react-leaflet';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { MapContainer, TileLayer, Marker, Popup, useMap, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import * as api from '@/app/services/api';
 
-// Custom store icon
-const storeIcon = new L.DivIcon({
-  html: `<div style="background-color: #10b981; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 6px rgba(0,0,0,0.3);">
+// Custom store icon, green for active stores and grey for inactive ones
+const storeIcon = (color: string) => new L.DivIcon({
+  html: `<div style="background-color: ${color}; width: 24px; height: 24px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 6px rgba(0,0,0,0.3);">
     <svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round">
       <path d="m2 7 4.41-4.41A2 2 0 0 1 7.83 2h8.34a2 2 0 0 1 1.42.59L22 7"></path>
       <path d="M4 12v8a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2v-8"></path>
@@ -21,47 +21,91 @@ const storeIcon = new L.DivIcon({
   iconAnchor: [12, 24],
   popupAnchor: [0, -24]
 });
+const activeStoreIcon = storeIcon('#10b981');
+const inactiveStoreIcon = storeIcon('#9ca3af');
 
-// Component to fit map bounds to markers
-function FitBounds({ locations }: { locations: api.StoreLocation[] }) {
+// OPTIMIZED: Markers only need position and status; popup details are fetched
+// for the one store that is opened, so the viewport payload stays narrow
+const MARKER_FIELDS: (keyof api.StoreLocation)[] = ['store_id', 'lat', 'lng', 'status'];
+const POPUP_FIELDS: (keyof api.StoreLocation)[] = ['city', 'state', 'weekly_revenue'];
+
+// Cluster marker sized by how many stores it stands for
+function clusterIcon(count: number) {
+  const size = count >= 100 ? 44 : count >= 10 ? 36 : 30;
+  return new L.DivIcon({
+    html: `<div style="background-color: rgba(16, 185, 129, 0.85); width: ${size}px; height: ${size}px; border-radius: 50%; display: flex; align-items: center; justify-content: center; border: 2px solid white; box-shadow: 0 2px 6px rgba(0,0,0,0.3); color: white; font-size: 12px; font-weight: 600;">${count}</div>`,
+    className: 'custom-store-cluster',
+    iconSize: [size, size],
+    iconAnchor: [size / 2, size / 2]
+  });
+}
+
+// Reloads stores for the visible bounds whenever the map stops moving
+function ViewportLoader({ onViewport }: { onViewport: (bbox: string, zoom: number) => void }) {
   const map = useMap();
-  
+
+  useMapEvents({
+    moveend: () => onViewport(map.getBounds().toBBoxString(), map.getZoom()),
+  });
+
   useEffect(() => {
-    if (locations.length > 0) {
-      const bounds = L.latLngBounds(
-        locations.map(loc => [Number(loc.lat), Number(loc.lng)])
-      );
-      map.fitBounds(bounds, { padding: [50, 50] });
-    }
-  }, [locations, map]);
-  
+    onViewport(map.getBounds().toBBoxString(), map.getZoom());
+  }, [map, onViewport]);
+
   return null;
 }
 
+// Zooms into a cluster when it is clicked
+function ClusterMarker({ cluster }: { cluster: api.MapCluster }) {
+  const map = useMap();
+  return (
+    <Marker
+      position={[Number(cluster.lat), Number(cluster.lng)]}
+      icon={clusterIcon(Number(cluster.count))}
+      eventHandlers={{
+        click: () => map.setView([Number(cluster.lat), Number(cluster.lng)], map.getZoom() + 2),
+      }}
+    />
+  );
+}
+
 export default function StoreMap({ enabled = true }: { enabled?: boolean }) {
-  const [storeLocations, setStoreLocations] = useState<api.StoreLocation[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [view, setView] = useState<api.ViewportData<api.StoreLocation> | null>(null);
+  const [details, setDetails] = useState<Record<number, api.StoreLocation | null>>({});
+  const latestRequest = useRef(0);
 
-  useEffect(() => {
-    // OPTIMIZED: Only fetch data when map is visible (enabled=true)
+  // OPTIMIZED: Server filters to the viewport and clusters at low zoom,
+  // so the payload scales with screen area instead of network size
+  const loadViewport = useCallback(async (bbox: string, zoom: number) => {
     if (!enabled) {
       return;
     }
-    
-    async function fetchLocations() {
-      try {
-        const locations = await api.getStoreLocations();
-        setStoreLocations(locations);
-      } catch (error) {
-        console.error('Failed to fetch store locations:', error);
-      } finally {
-        setLoading(false);
+    const requestId = ++latestRequest.current;
+    try {
+      const data = await api.getStoreLocationsInView(bbox, zoom, MARKER_FIELDS);
+      // Ignore responses for viewports the user has already panned away from
+      if (requestId === latestRequest.current) {
+        setView(data);
       }
+    } catch (error) {
+      console.error('Failed to fetch store locations:', error);
     }
-    fetchLocations();
   }, [enabled]);
 
-  if (loading) {
+  const loadDetails = useCallback(async (storeId: number) => {
+    if (storeId in details) {
+      return;
+    }
+    try {
+      const store = await api.getStoreDetails(storeId, POPUP_FIELDS);
+      setDetails((loaded) => ({ ...loaded, [storeId]: store }));
+    } catch (error) {
+      console.error(`Failed to fetch store ${storeId}:`, error);
+    }
+  }, [details]);
+
+  // Don't mount the map until it is visible: Leaflet measures its container on mount
+  if (!enabled && !view) {
     return (
       <div className="relative w-full h-96 bg-gray-100 rounded-lg flex items-center justify-center">
         <div className="text-gray-600 text-sm">Loading store network map...</div>
@@ -85,38 +129,56 @@ export default function StoreMap({ enabled = true }: { enabled?: boolean }) {
           url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
         />
         
-        {storeLocations.map((store) => (
-          <Marker
-            key={store.store_id}
-            position={[Number(store.lat), Number(store.lng)]}
-            icon={storeIcon}
-          >
-            <Popup>
-              <div className="p-2">
-                <div className="flex items-center gap-2 mb-2">
-                  <Store className="w-4 h-4 text-green-600" />
-                  <div className="font-semibold text-gray-900">{store.city}, {store.state}</div>
-                </div>
-                <div className="text-sm text-gray-600 space-y-1">
-                  <div>Store ID: <span className="font-medium">{store.store_id}</span></div>
-                  <div>Weekly Revenue: <span className="font-medium text-green-600">
-                    ${Number(store.weekly_revenue).toLocaleString()}
-                  </span></div>
-                  <div>
-                    Status: <span className={`font-medium ${
-                      store.status === 'active' ? 'text-green-600' : 'text-gray-400'
-                    }`}>
-                      {store.status === 'active' ? 'Active' : 'Inactive'}
-                    </span>
+        <ViewportLoader onViewport={loadViewport} />
+
+        {view?.clusters.map((cluster) => (
+          <ClusterMarker key={`${cluster.lat},${cluster.lng}`} cluster={cluster} />
+        ))}
+
+        {view?.points.map((store) => {
+          const detail = details[store.store_id];
+          return (
+            <Marker
+              key={store.store_id}
+              position={[Number(store.lat), Number(store.lng)]}
+              icon={store.status === 'active' ? activeStoreIcon : inactiveStoreIcon}
+              eventHandlers={{ popupopen: () => loadDetails(store.store_id) }}
+            >
+              <Popup>
+                <div className="p-2">
+                  <div className="flex items-center gap-2 mb-2">
+                    <Store className="w-4 h-4 text-green-600" />
+                    <div className="font-semibold text-gray-900">
+                      {detail ? `${detail.city}, ${detail.state}` : store.store_id in details ? `Store ${store.store_id}` : 'Loading...'}
+                    </div>
+                  </div>
+                  <div className="text-sm text-gray-600 space-y-1">
+                    <div>Store ID: <span className="font-medium">{store.store_id}</span></div>
+                    {detail && (
+                      <div>Weekly Revenue: <span className="font-medium text-green-600">
+                        ${Number(detail.weekly_revenue).toLocaleString()}
+                      </span></div>
+                    )}
+                    <div>
+                      Status: <span className={`font-medium ${
+                        store.status === 'active' ? 'text-green-600' : 'text-gray-400'
+                      }`}>
+                        {store.status === 'active' ? 'Active' : 'Inactive'}
+                      </span>
+                    </div>
                   </div>
                 </div>
-              </div>
-            </Popup>
-          </Marker>
-        ))}
-        
-        <FitBounds locations={storeLocations} />
+              </Popup>
+            </Marker>
+          );
+        })}
       </MapContainer>
+
+      {!view && (
+        <div className="absolute inset-0 bg-gray-100/80 flex items-center justify-center z-[1000]">
+          <div className="text-gray-600 text-sm">Loading store network map...</div>
+        </div>
+      )}
       
       {/* Legend overlay */}
       <div className="absolute top-4 right-4 bg-white rounded-lg shadow-lg p-3 text-sm border border-gray-200 z-[1000]">
@@ -125,7 +187,7 @@ export default function StoreMap({ enabled = true }: { enabled?: boolean }) {
           <div className="font-semibold text-gray-900">Store Network</div>
         </div>
         <div className="text-xs text-gray-600">
-          {storeLocations.length} retail locations
+          {view ? view.total : 0} retail locations in view
         </div>
       </div>
     </div>
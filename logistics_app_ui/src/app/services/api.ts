@@ -27,10 +27,38 @@ async function fetchAPI<T>(endpoint: string): Promise<T> {
   }
 }
 
+/**
+ * Keyset-paginated fetch: the next page cursor arrives in the X-Next-Cursor header
+ */
+async function fetchPage<T>(endpoint: string, limit: number, cursor?: string | null): Promise<Page<T>> {
+  const separator = endpoint.includes('?') ? '&' : '?';
+  const query = `limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`;
+  try {
+    const response = await fetch(`${API_BASE_URL}${endpoint}${separator}${query}`);
+
+    if (!response.ok) {
+      throw new Error(`API Error: ${response.status} ${response.statusText}`);
+    }
+
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  } catch (error) {
+    console.error(`Failed to fetch ${endpoint}:`, error);
+    throw error;
+  }
+}
+
 // ============================================================================
 // TYPE DEFINITIONS
 // ============================================================================
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;  // null on the last page
+}
+
 export interface KPIData {
   network_throughput: number;
   late_arrivals: number;
@@ -111,6 +139,22 @@ export interface StoreLocation {
   status: 'active' | 'inactive';
 }
 
+export interface MapCluster {
+  lat: number;
+  lng: number;
+  count: number;
+}
+
+/**
+ * Viewport response: clusters at low zoom, individual points otherwise
+ */
+export interface ViewportData<T> {
+  zoom: number;
+  total: number;  // points inside the bbox, clustered or not
+  clusters: MapCluster[];
+  points: T[];
+}
+
 export interface Alert {
   id: number;
   type: 'critical' | 'warning' | 'info';
@@ -174,10 +218,10 @@ export async function getRegionalStatus(): Promise<RegionalStatus[]> {
 }
 
 /**
- * Fetch 24-hour throughput trend data
+ * Fetch 24-hour throughput trend data for a day (YYYY-MM-DD; defaults to the latest day)
  */
-export async function getThroughputData(): Promise<ThroughputData[]> {
-  return fetchAPI<ThroughputData[]>('/api/throughput');
+export async function getThroughputData(date?: string): Promise<ThroughputData[]> {
+  return fetchAPI<ThroughputData[]>(date ? `/api/throughput?date=${date}` : '/api/throughput');
 }
 
 /**
@@ -187,6 +231,13 @@ export async function getFleetData(limit: number = 50): Promise<FleetTruck[]> {
   return fetchAPI<FleetTruck[]>(`/api/fleet?limit=${limit}`);
 }
 
+/**
+ * Fetch one page of the active fleet; pass the previous page's nextCursor to continue
+ */
+export async function getFleetPage(limit: number = 50, cursor?: string | null): Promise<Page<FleetTruck>> {
+  return fetchPage<FleetTruck>('/api/fleet', limit, cursor);
+}
+
 /**
  * Fetch store risk assessment data
  */
@@ -194,6 +245,13 @@ export async function getRiskStores(limit: number = 20): Promise<RiskStore[]> {
   return fetchAPI<RiskStore[]>(`/api/risk-stores?limit=${limit}`);
 }
 
+/**
+ * Fetch one page of at-risk stores (highest risk first); pass nextCursor to continue
+ */
+export async function getRiskStoresPage(limit: number = 20, cursor?: string | null): Promise<Page<RiskStore>> {
+  return fetchPage<RiskStore>('/api/risk-stores', limit, cursor);
+}
+
 /**
  * Fetch delay root cause analysis
  */
@@ -208,17 +266,44 @@ export async function getDelayCauses(days: number = 7): Promise<DelayCause[]> {
 }
 
 /**
- * Fetch ETA prediction accuracy data
+ * Fetch ETA prediction accuracy data (last `days` days; all history when omitted)
  */
-export async function getETAAccuracy(): Promise<ETAAccuracy[]> {
-  return fetchAPI<ETAAccuracy[]>('/api/eta-accuracy');
+export async function getETAAccuracy(days?: number): Promise<ETAAccuracy[]> {
+  return fetchAPI<ETAAccuracy[]>(days ? `/api/eta-accuracy?days=${days}` : '/api/eta-accuracy');
+}
+
+/**
+ * Append a ?fields= projection so the server only selects the columns we render
+ */
+function withFields(endpoint: string, fields?: string[]): string {
+  return fields && fields.length > 0 ? `${endpoint}?fields=${fields.join(',')}` : endpoint;
 }
 
 /**
  * Fetch truck GPS locations for live map
+ * Pass `fields` (e.g. ['id', 'lat', 'lng']) to receive only those columns
+ */
+export async function getTruckLocations(fields?: (keyof TruckLocation)[]): Promise<TruckLocation[]> {
+  return fetchAPI<TruckLocation[]>(withFields('/api/truck-locations', fields));
+}
+
+/**
+ * Build ?bbox=&zoom= for a viewport query (bbox in Leaflet toBBoxString() order)
+ */
+function viewportQuery(bbox: string, zoom: number, fields?: string[]): string {
+  const projection = fields && fields.length > 0 ? `&fields=${fields.join(',')}` : '';
+  return `?bbox=${encodeURIComponent(bbox)}&zoom=${Math.round(zoom)}${projection}`;
+}
+
+/**
+ * Fetch the trucks inside the map viewport, clustered server-side at low zoom
  */
-export async function getTruckLocations(): Promise<TruckLocation[]> {
-  return fetchAPI<TruckLocation[]>('/api/truck-locations');
+export async function getTruckLocationsInView(
+  bbox: string,
+  zoom: number,
+  fields?: (keyof TruckLocation)[]
+): Promise<ViewportData<TruckLocation>> {
+  return fetchAPI<ViewportData<TruckLocation>>(`/api/truck-locations${viewportQuery(bbox, zoom, fields)}`);
 }
 
 /**
@@ -230,9 +315,71 @@ export async function getRSCLocations(): Promise<RSCLocation[]> {
 
 /**
  * Fetch store locations
+ * Pass `fields` (e.g. ['store_id', 'lat', 'lng']) to receive only those columns
  */
-export async function getStoreLocations(): Promise<StoreLocation[]> {
-  return fetchAPI<StoreLocation[]>('/api/store-locations');
+export async function getStoreLocations(fields?: (keyof StoreLocation)[]): Promise<StoreLocation[]> {
+  return fetchAPI<StoreLocation[]>(withFields('/api/store-locations', fields));
+}
+
+/**
+ * Fetch one store (e.g. map popup details); null when the store has no location
+ * Pass `fields` (e.g. ['city', 'state']) to receive only those columns
+ */
+export async function getStoreDetails(
+  storeId: number,
+  fields?: (keyof StoreLocation)[]
+): Promise<StoreLocation | null> {
+  const projection = fields && fields.length > 0 ? `&fields=${fields.join(',')}` : '';
+  const stores = await fetchAPI<StoreLocation[]>(`/api/store-locations?store_id=${storeId}${projection}`);
+  return stores[0] ?? null;
+}
+
+/**
+ * Fetch the stores inside the map viewport, clustered server-side at low zoom
+ */
+export async function getStoreLocationsInView(
+  bbox: string,
+  zoom: number,
+  fields?: (keyof StoreLocation)[]
+): Promise<ViewportData<StoreLocation>> {
+  return fetchAPI<ViewportData<StoreLocation>>(`/api/store-locations${viewportQuery(bbox, zoom, fields)}`);
+}
+
+export type SpatialKind = 'stores' | 'rscs';
+
+export type WithDistance<T> = T & { distance_km: number };
+
+/**
+ * Stores or RSCs within `km` of a point, nearest first
+ */
+export async function getWithinRadius(
+  lat: number,
+  lng: number,
+  km: number,
+  kind: SpatialKind = 'stores'
+): Promise<{ kind: SpatialKind; km: number; results: WithDistance<StoreLocation | RSCLocation>[] }> {
+  return fetchAPI(`/api/spatial/radius?lat=${lat}&lng=${lng}&km=${km}&kind=${kind}`);
+}
+
+/**
+ * The k stores or RSCs nearest to a store (e.g. kind='rscs' for its nearest RSC)
+ */
+export async function getNearestToStore(
+  storeId: number,
+  k: number = 1,
+  kind: SpatialKind = 'rscs'
+): Promise<{ kind: SpatialKind; results: WithDistance<StoreLocation | RSCLocation>[] }> {
+  return fetchAPI(`/api/spatial/nearest?store_id=${storeId}&k=${k}&kind=${kind}`);
+}
+
+/**
+ * Stores within `km` of a truck's latest position
+ */
+export async function getImpactedStores(
+  truckId: string,
+  km: number = 100
+): Promise<{ truck: TruckLocation; km: number; stores: WithDistance<StoreLocation>[] }> {
+  return fetchAPI(`/api/spatial/impacted-stores?truck_id=${encodeURIComponent(truckId)}&km=${km}`);
 }
 
 /**
@@ -268,6 +415,13 @@ export async function getAlerts(): Promise<Alert[]> {
   return fetchAPI<Alert[]>('/api/alerts');
 }
 
+/**
+ * Fetch one page of alerts (most severe first); pass nextCursor to continue
+ */
+export async function getAlertsPage(limit: number = 20, cursor?: string | null): Promise<Page<Alert>> {
+  return fetchPage<Alert>('/api/alerts', limit, cursor);
+}
+
 /**
  * Health check
  */
@@ -2,39 +2,59 @@
 -- MAGIC %md
 -- MAGIC # Analytics Layer: Consolidated Views for Unity Catalog Metrics
 -- MAGIC 
--- MAGIC Two essential views built on gold tables:
+-- MAGIC Essential views built on gold tables:
 -- MAGIC 1. **logistics_fact** - Unified fact table for detailed analysis
 -- MAGIC 2. **supply_chain_kpi** - Executive KPI summary
+-- MAGIC 3. **supply_chain_kpi_cube** - The same KPIs at every grain, for single-row lookups
+-- MAGIC 
+-- MAGIC All three are materialized views with deterministic definitions (no `CURRENT_TIMESTAMP()`,
+-- MAGIC no `ORDER BY`), so an update can refresh them incrementally: only new
+-- MAGIC `delivered_events` rows and rows whose store / vendor / carrier metrics or store /
+-- MAGIC vendor attributes changed are recomputed. Store and vendor attributes are joined
+-- MAGIC from the current `stores_bronze` / `vendors_bronze` rows (row tracking enabled).
+-- MAGIC The last refresh time is available from the table history.
 
 -- COMMAND ----------
 
 -- DBTITLE 1,Logistics Performance Fact Table
-CREATE OR REFRESH LIVE TABLE logistics_fact
+CREATE OR REFRESH MATERIALIZED VIEW logistics_fact
+-- Clustered on the dashboard predicates (date window, store, region); the autoOptimize
+-- properties match AUTO_OPTIMIZE_PROPERTIES in pipelines/config/config.py
+CLUSTER BY (event_date, store_id, region_id)
 COMMENT "Unified logistics fact table with all dimensions and metrics for UC metrics and BI"
+TBLPROPERTIES (
+  'delta.autoOptimize.optimizeWrite' = 'true',
+  'delta.autoOptimize.autoCompact' = 'true',
+  'delta.enableChangeDataFeed' = 'true',
+  'delta.enableRowTracking' = 'true'
+)
 AS
 SELECT 
   -- Event identifiers
   lg.event_id,
+  lg.truck_id,
   lg.shipment_id,
   lg.event_ts AS delivery_timestamp,
+  lg.event_date,
+  lg.event_hour,
   lg.ingest_date,
   
-  -- Store dimension
+  -- Store dimension (current attributes)
   lg.store_id,
-  lg.store_name,
-  lg.store_city,
-  lg.store_state,
+  st.store_name,
+  st.city AS store_city,
+  st.state AS store_state,
   lg.region_id,
-  lg.store_weekly_revenue,
-  lg.store_latitude,
-  lg.store_longitude,
+  st.weekly_revenue AS store_weekly_revenue,
+  st.latitude AS store_latitude,
+  st.longitude AS store_longitude,
   
-  -- Vendor dimension  
+  -- Vendor dimension (current attributes)
   lg.vendor_id,
-  lg.vendor_name,
+  v.vendor_name,
   lg.vendor_type,
-  lg.vendor_risk_tier,
-  lg.vendor_on_time_pct,
+  v.risk_tier AS vendor_risk_tier,
+  v.on_time_pct AS vendor_on_time_pct,
   
   -- Carrier dimension
   lg.carrier,
@@ -81,12 +101,15 @@ SELECT
     ELSE 'LOW'
   END AS store_risk_tier,
   
-  ROUND(sm.store_weekly_revenue * (sm.delayed_shipments / sm.total_deliveries), 2) AS revenue_at_risk,
-  
-  -- Metadata
-  CURRENT_TIMESTAMP() AS fact_refresh_ts
+  ROUND(sm.store_weekly_revenue * (sm.delayed_shipments / sm.total_deliveries), 2) AS revenue_at_risk
   
-FROM LIVE.logistics_silver lg
+FROM LIVE.delivered_events lg
+
+-- Join current store and vendor attributes
+LEFT JOIN LIVE.stores_bronze st
+  ON lg.store_id = st.store_id
+LEFT JOIN LIVE.vendors_bronze v
+  ON lg.vendor_id = v.vendor_id
 
 -- Join store metrics
 LEFT JOIN LIVE.store_delay_metrics sm
@@ -99,14 +122,12 @@ LEFT JOIN LIVE.vendor_performance vp
   
 -- Join carrier metrics
 LEFT JOIN LIVE.carrier_performance cp
-  ON lg.carrier = cp.carrier
-  
-WHERE lg.event_type = 'DELIVERED';
+  ON lg.carrier = cp.carrier;
 
 -- COMMAND ----------
 
 -- DBTITLE 1,Supply Chain KPI Summary
-CREATE OR REFRESH LIVE TABLE supply_chain_kpi
+CREATE OR REFRESH MATERIALIZED VIEW supply_chain_kpi
 COMMENT "Executive KPI rollup by region, vendor type, and carrier for dashboards"
 AS
 SELECT
@@ -119,6 +140,12 @@ SELECT
   SUM(is_delayed) AS delayed_count,
   SUM(is_severely_delayed) AS severely_delayed_count,
   
+  -- Additive components, so coarser grains can be rolled up exactly
+  SUM(delay_minutes) AS total_delay_minutes,
+  COUNT(delay_minutes) AS delay_reported_count,
+  COUNT(shipment_total_value) AS valued_shipments_count,
+  SUM(temperature_celsius) AS total_temperature,
+  
   -- Performance metrics
   ROUND(AVG(delay_minutes), 2) AS avg_delay_minutes,
   ROUND((SUM(is_delayed) / COUNT(*) * 100), 2) AS delay_rate_pct,
@@ -140,15 +167,74 @@ SELECT
   
   -- Risk distribution
   SUM(CASE WHEN store_risk_tier = 'HIGH' THEN 1 ELSE 0 END) AS high_risk_stores_count,
-  SUM(CASE WHEN store_risk_tier = 'MEDIUM' THEN 1 ELSE 0 END) AS medium_risk_stores_count,
-  
-  -- Metadata
-  CURRENT_TIMESTAMP() AS kpi_refresh_ts
+  SUM(CASE WHEN store_risk_tier = 'MEDIUM' THEN 1 ELSE 0 END) AS medium_risk_stores_count
   
 FROM LIVE.logistics_fact
 
-GROUP BY region_id, vendor_type, carrier
-ORDER BY delay_rate_pct DESC;
+GROUP BY region_id, vendor_type, carrier;
+
+-- COMMAND ----------
+
+-- DBTITLE 1,Supply Chain KPI Cube
+CREATE OR REFRESH MATERIALIZED VIEW supply_chain_kpi_cube
+COMMENT "Supply chain KPIs at every grain of region, vendor type and carrier (grain = 'network' for the total)"
+AS
+SELECT
+  -- Which dimensions this row is grouped by, e.g. 'network', 'region_id', 'region_id,carrier'
+  COALESCE(
+    NULLIF(CONCAT_WS(',',
+      IF(GROUPING(region_id) = 0, 'region_id', NULL),
+      IF(GROUPING(vendor_type) = 0, 'vendor_type', NULL),
+      IF(GROUPING(carrier) = 0, 'carrier', NULL)
+    ), ''),
+    'network'
+  ) AS grain,
+  region_id,
+  vendor_type,
+  carrier,
+  
+  -- Volume metrics (summed from the finest grain in supply_chain_kpi)
+  SUM(total_deliveries) AS total_deliveries,
+  SUM(delayed_count) AS delayed_count,
+  SUM(severely_delayed_count) AS severely_delayed_count,
+  SUM(total_delay_minutes) AS total_delay_minutes,
+  SUM(delay_reported_count) AS delay_reported_count,
+  
+  -- Performance metrics: ratios of sums, never averages of averages
+  ROUND(SUM(total_delay_minutes) / NULLIF(SUM(delay_reported_count), 0), 2) AS avg_delay_minutes,
+  ROUND(SUM(delayed_count) * 100.0 / NULLIF(SUM(total_deliveries), 0), 2) AS delay_rate_pct,
+  ROUND(SUM(severely_delayed_count) * 100.0 / NULLIF(SUM(total_deliveries), 0), 2) AS severe_delay_rate_pct,
+  ROUND((SUM(total_deliveries) - SUM(delayed_count)) * 100.0 / NULLIF(SUM(total_deliveries), 0), 2) AS on_time_rate_pct,
+  
+  -- Value metrics
+  ROUND(SUM(total_value_delivered), 2) AS total_value_delivered,
+  ROUND(SUM(total_value_delivered) / NULLIF(SUM(valued_shipments_count), 0), 2) AS avg_shipment_value,
+  ROUND(SUM(total_revenue_at_risk), 2) AS total_revenue_at_risk,
+  
+  -- Quality metrics
+  ROUND(SUM(total_temperature) / NULLIF(SUM(temp_monitored_count), 0), 2) AS avg_temperature,
+  SUM(temp_monitored_count) AS temp_monitored_count,
+  
+  -- Vendor breakdown
+  SUM(ace_vendor_shipments) AS ace_vendor_shipments,
+  SUM(non_ace_vendor_shipments) AS non_ace_vendor_shipments,
+  
+  -- Risk distribution
+  SUM(high_risk_stores_count) AS high_risk_stores_count,
+  SUM(medium_risk_stores_count) AS medium_risk_stores_count
+  
+FROM LIVE.supply_chain_kpi
+
+GROUP BY GROUPING SETS (
+  (),
+  (region_id),
+  (vendor_type),
+  (carrier),
+  (region_id, vendor_type),
+  (region_id, carrier),
+  (vendor_type, carrier),
+  (region_id, vendor_type, carrier)
+);
 
 -- COMMAND ----------
 
@@ -170,6 +256,13 @@ ORDER BY delay_rate_pct DESC;
 -- MAGIC GROUP BY region_id
 -- MAGIC ```
 -- MAGIC 
+-- MAGIC **Network or slice KPIs (single-row lookup)**:
+-- MAGIC ```sql
+-- MAGIC SELECT delay_rate_pct, avg_delay_minutes
+-- MAGIC FROM kaustavpaul_demo.ace_demo.supply_chain_kpi_cube
+-- MAGIC WHERE grain = 'region_id,carrier' AND region_id = 'MIDWEST' AND carrier = 'FedEx'
+-- MAGIC ```
+-- MAGIC 
 -- MAGIC ### Quick Analysis Queries
 -- MAGIC 
 -- MAGIC **High-Risk Stores**:
@@ -185,10 +278,10 @@ ORDER BY delay_rate_pct DESC;
 -- MAGIC ```sql
 -- MAGIC SELECT 
 -- MAGIC   vendor_type,
--- MAGIC   AVG(on_time_rate_pct) as avg_on_time_rate,
--- MAGIC   AVG(delay_rate_pct) as avg_delay_rate,
--- MAGIC   SUM(total_value_delivered) as total_value
--- MAGIC FROM kaustavpaul_demo.ace_demo.supply_chain_kpi
--- MAGIC GROUP BY vendor_type
+-- MAGIC   on_time_rate_pct,
+-- MAGIC   delay_rate_pct,
+-- MAGIC   total_value_delivered as total_value
+-- MAGIC FROM kaustavpaul_demo.ace_demo.supply_chain_kpi_cube
+-- MAGIC WHERE grain = 'vendor_type'
 -- MAGIC ```
 
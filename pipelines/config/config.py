@@ -27,6 +27,85 @@ CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", f"{VOLUME_BASE}/checkpoints")
 
 # Streaming Configuration
 TELEMETRY_CHECKPOINT = f"{CHECKPOINT_PATH}/logistics_bronze/"
+DIMENSIONS_CHECKPOINT = f"{CHECKPOINT_PATH}/dimensions"
+
+# Auto Loader (telemetry ingestion)
+# File format: csv (plain or compressed, e.g. .csv.gz, detected by extension), parquet, or json
+TELEMETRY_FORMAT = os.getenv("TELEMETRY_FORMAT", "csv")
+# Upper bounds per micro-batch so a large backfill is split into many batches
+TELEMETRY_MAX_FILES_PER_TRIGGER = int(os.getenv("TELEMETRY_MAX_FILES_PER_TRIGGER", "1000"))
+TELEMETRY_MAX_BYTES_PER_TRIGGER = os.getenv("TELEMETRY_MAX_BYTES_PER_TRIGGER", "10g")
+# File notification discovery (queue-based) instead of listing the directory every trigger;
+# requires permission to set up cloud notification resources
+TELEMETRY_USE_NOTIFICATIONS = os.getenv("TELEMETRY_USE_NOTIFICATIONS", "false").lower() == "true"
+
+TELEMETRY_READER_OPTIONS = {
+    "cloudFiles.format": TELEMETRY_FORMAT,
+    "cloudFiles.schemaLocation": TELEMETRY_CHECKPOINT,
+    "cloudFiles.maxFilesPerTrigger": str(TELEMETRY_MAX_FILES_PER_TRIGGER),
+    "cloudFiles.maxBytesPerTrigger": TELEMETRY_MAX_BYTES_PER_TRIGGER,
+    "cloudFiles.useNotifications": str(TELEMETRY_USE_NOTIFICATIONS).lower(),
+    **({"header": "true"} if TELEMETRY_FORMAT == "csv" else {}),
+}
+
+# Late Data Handling
+# Watermark delay on event_ts for the streaming silver path. Re-delivered event_ids
+# within this window are dropped, and dedup state older than it is purged so memory
+# stays bounded. Events arriving later than this behind the newest event_ts seen are
+# dropped, which includes backfills of historical telemetry once newer files (split
+# across triggers by TELEMETRY_MAX_*_PER_TRIGGER) have advanced the watermark. Set it
+# to the longest replay horizon expected; dedup state grows with it (one event_id per
+# event in the window). Older backfills need a full refresh of logistics_silver.
+# logistics_bronze counts at-risk rows under the ingested_within_lateness expectation.
+EVENT_LATENESS_THRESHOLD = os.getenv("EVENT_LATENESS_THRESHOLD", "7 days")
+
+# Join Configuration
+# Small, bounded dimensions always shipped whole to every executor in the silver
+# enrichment joins (approx. rows: stores 250, vendors 40). shipments_bronze grows
+# daily, so it is left to BROADCAST_JOIN_THRESHOLD: broadcast while small, then shuffled.
+BROADCAST_DIMENSIONS = ("stores_bronze", "vendors_bronze")
+# Largest table (bytes) Spark may broadcast on its own (spark.sql.autoBroadcastJoinThreshold)
+BROADCAST_JOIN_THRESHOLD = int(os.getenv("BROADCAST_JOIN_THRESHOLD", str(64 * 1024 * 1024)))
+
+# Skew Handling
+# Shipments are hub-dominated (75% leave a few major RSCs), so work keyed on origin_city
+# lands on a few straggler tasks. Salting splits each key over SKEW_SALT_BUCKETS
+# sub-keys before the shuffle (1 disables it) in the RSC aggregates.
+SKEW_SALT_BUCKETS = int(os.getenv("SKEW_SALT_BUCKETS", "8"))
+# The silver shipment join is keyed on shipment_id, which carries only a handful of
+# events per shipment, so it is not salted unless opted in (for feeds where single
+# shipments do dominate). Salting replicates shipments_bronze SKEW_SALT_BUCKETS times.
+SALT_SHIPMENT_JOIN = os.getenv("SALT_SHIPMENT_JOIN", "false").lower() == "true"
+# Adaptive query execution splits oversized shuffle partitions of batch sort-merge joins
+# at runtime (not applied to streaming micro-batches, hence salting above). Passed as
+# spark_conf to the batch tables with shuffled joins, never set on the pipeline session.
+ADAPTIVE_SKEW_JOIN = os.getenv("ADAPTIVE_SKEW_JOIN", "true").lower() == "true"
+SKEW_SPARK_CONF = {
+    "spark.sql.adaptive.enabled": "true",
+    "spark.sql.adaptive.skewJoin.enabled": str(ADAPTIVE_SKEW_JOIN).lower(),
+    # A partition is skewed when > factor x the median partition size and > the threshold
+    "spark.sql.adaptive.skewJoin.skewedPartitionFactor": os.getenv("SKEWED_PARTITION_FACTOR", "5"),
+    "spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes": os.getenv("SKEWED_PARTITION_THRESHOLD", "64MB"),
+}
+
+# Distinct-count Sketches
+# HyperLogLog precision for truck/store/shipment sketches in the gold rollups:
+# 2^K registers, relative standard error ~1.04 / sqrt(2^K) (K=12 -> ~1.6%, ~4 KB per sketch)
+HLL_LG_CONFIG_K = int(os.getenv("HLL_LG_CONFIG_K", "12"))
+
+# Physical Layout
+# Liquid clustering keys follow the dashboard predicates in logistics_app_ui/backend/server.py
+# (at most 4 keys per table). origin_city is left out of silver: RSC queries group by
+# it over the whole table rather than filtering on it.
+SILVER_CLUSTER_BY = ["event_type", "event_date", "truck_id", "store_id"]
+# Event-level store queries on the slim dashboard table filter by store
+SLIM_CLUSTER_BY = ["store_id"]
+# logistics_fact declares its own CLUSTER BY in analytics_views.sql
+# Write-time file sizing and post-write compaction for the clustered tables
+AUTO_OPTIMIZE_PROPERTIES = {
+    "delta.autoOptimize.optimizeWrite": "true",
+    "delta.autoOptimize.autoCompact": "true",
+}
 
 # Table Schemas
 LOGISTICS_SCHEMA = StructType([
@@ -0,0 +1 @@
+# Local pipeline harness package (dlt shim + runner)
@@ -0,0 +1,221 @@
+"""
+Local DLT Shim: the subset of the `dlt` API used by pipelines/transform
+Datasets are registered on import and materialized on demand as cached batch
+DataFrames (one full refresh), so transforms run unchanged on local-mode Spark
+"""
+import re
+import time
+
+from pyspark.sql import SparkSession, Window
+from pyspark.sql.functions import coalesce, col, expr, lead, lit, row_number, sum as _sum, when
+
+
+# name -> {"kind", "build", "expectations", "flows"}
+_datasets = {}
+# name -> cached DataFrame
+_materialized = {}
+# name -> {"rows", "seconds", "dropped"}
+stats = {}
+_building = []
+
+
+def _session():
+    return SparkSession.getActiveSession()
+
+
+def _register(name, kind, build=None, expectations=(), spark_conf=None):
+    if name in _datasets:
+        raise ValueError(f"Dataset {name} is defined more than once")
+    _datasets[name] = {"kind": kind, "build": build, "expectations": list(expectations),
+                       "flows": [], "spark_conf": dict(spark_conf or {})}
+
+
+def _expectation(action, name, condition):
+    def decorator(func):
+        # Decorators apply bottom-up; keep source order for reporting
+        func._expectations = [(name, condition, action)] + getattr(func, "_expectations", [])
+        return func
+    return decorator
+
+
+def expect(name, condition):
+    """Record violations, keep every row"""
+    return _expectation("keep", name, condition)
+
+
+def expect_or_drop(name, condition):
+    """Drop rows violating condition (NULL counts as a violation)"""
+    return _expectation("drop", name, condition)
+
+
+def expect_or_fail(name, condition):
+    """Fail the update if any row violates condition"""
+    return _expectation("fail", name, condition)
+
+
+def _dataset_decorator(kind, name, spark_conf=None):
+    def decorator(func):
+        _register(name or func.__name__, kind, func, getattr(func, "_expectations", []), spark_conf)
+        return func
+    return decorator
+
+
+def table(func=None, name=None, comment=None, table_properties=None, cluster_by=None,
+          partition_cols=None, spark_conf=None, **kwargs):
+    """
+    @dlt.table; spark_conf applies while the dataset is computed, physical
+    layout options (cluster_by, table_properties) are ignored locally
+    """
+    if callable(func):
+        return _dataset_decorator("table", None)(func)
+    return _dataset_decorator("table", name, spark_conf)
+
+
+def view(func=None, name=None, comment=None, spark_conf=None, **kwargs):
+    """@dlt.view"""
+    if callable(func):
+        return _dataset_decorator("view", None)(func)
+    return _dataset_decorator("view", name, spark_conf)
+
+
+def create_streaming_table(name, comment=None, table_properties=None, cluster_by=None,
+                           partition_cols=None, schema=None, expect_all=None,
+                           expect_all_or_drop=None, expect_all_or_fail=None, **kwargs):
+    """Target for apply_changes flows"""
+    _register(name, "streaming table")
+
+
+def apply_changes(target, source, keys, sequence_by, stored_as_scd_type=1,
+                  except_column_list=None, column_list=None, **kwargs):
+    """
+    CDC flow into target from the full source snapshot.
+    SCD type 1 keeps the latest row per key; type 2 keeps every row with
+    __START_AT / __END_AT validity bounds taken from sequence_by.
+    """
+    if target not in _datasets:
+        raise ValueError(f"apply_changes target {target} has no create_streaming_table")
+    _datasets[target]["flows"].append({
+        "source": source,
+        "keys": list(keys),
+        "sequence_by": col(sequence_by) if isinstance(sequence_by, str) else sequence_by,
+        "scd_type": int(stored_as_scd_type),
+        "except_column_list": list(except_column_list or []),
+        "column_list": list(column_list or []),
+    })
+
+
+def _apply_flow(flow):
+    changes = read(flow["source"]).withColumn("__sequence", flow["sequence_by"])
+    by_key = Window.partitionBy(*flow["keys"])
+    if flow["scd_type"] == 1:
+        latest = by_key.orderBy(col("__sequence").desc())
+        result = changes.withColumn("__rank", row_number().over(latest)).filter(col("__rank") == 1).drop("__rank")
+    else:
+        result = (
+            changes
+            .withColumn("__START_AT", col("__sequence"))
+            .withColumn("__END_AT", lead(col("__sequence")).over(by_key.orderBy(col("__sequence"))))
+        )
+    if flow["column_list"]:
+        result = result.select(*flow["column_list"], *[c for c in ("__START_AT", "__END_AT") if c in result.columns])
+    return result.drop("__sequence", *flow["except_column_list"])
+
+
+def _apply_expectations(name, df, expectations):
+    if not expectations:
+        return df, 0
+    failures = df.agg(*[
+        _sum(when(coalesce(expr(condition), lit(False)), 0).otherwise(1)).alias(rule)
+        for rule, condition, _ in expectations
+    ]).first()
+    dropped = 0
+    for rule, condition, action in expectations:
+        violations = failures[rule] or 0
+        if action == "fail" and violations:
+            raise ValueError(f"{name}: expectation {rule} failed for {violations} rows")
+        if action == "drop":
+            df = df.filter(coalesce(expr(condition), lit(False)))
+            # A row failing several rules is counted once per rule, as in the DLT event log
+            dropped += violations
+    return df, dropped
+
+
+def _materialize(name):
+    if name in _building:
+        raise ValueError(f"Dependency cycle: {' -> '.join(_building + [name])}")
+    dataset = _datasets[name]
+    conf = _session().conf
+    previous = {key: conf.get(key, None) for key in dataset["spark_conf"]}
+    for key, value in dataset["spark_conf"].items():
+        conf.set(key, value)
+    _building.append(name)
+    try:
+        if dataset["flows"]:
+            flows = [_apply_flow(flow) for flow in dataset["flows"]]
+            df = flows[0]
+            for other in flows[1:]:
+                df = df.unionByName(other, allowMissingColumns=True)
+        else:
+            df = dataset["build"]()
+        # Upstream datasets were materialized while building df, so this times name alone
+        start = time.perf_counter()
+        df, dropped = _apply_expectations(name, df, dataset["expectations"])
+        df = df.cache()
+        rows = df.count()
+        stats[name] = {"kind": dataset["kind"], "rows": rows,
+                       "seconds": time.perf_counter() - start, "dropped": dropped}
+    finally:
+        _building.pop()
+        for key, value in previous.items():
+            if value is None:
+                conf.unset(key)
+            else:
+                conf.set(key, value)
+    df.createOrReplaceTempView(name)
+    _materialized[name] = df
+    return df
+
+
+def read(name):
+    """Complete dataset; tables outside the pipeline are read from the catalog"""
+    if name in _materialized:
+        return _materialized[name]
+    if name in _datasets:
+        return _materialize(name)
+    return _session().table(name)
+
+
+def read_stream(name):
+    """A local run is a single full refresh, so a stream read is the whole batch"""
+    return read(name)
+
+
+_MATERIALIZED_VIEW = re.compile(
+    r"CREATE\s+OR\s+REFRESH\s+(?:MATERIALIZED\s+VIEW|LIVE\s+TABLE|STREAMING\s+TABLE)\s+(\w+)(.*?)^\s*AS\s*$(.*)",
+    re.IGNORECASE | re.DOTALL | re.MULTILINE
+)
+_LIVE_REFERENCE = re.compile(r"\bLIVE\.(\w+)", re.IGNORECASE)
+
+
+def sql_file(path):
+    """Register each CREATE OR REFRESH MATERIALIZED VIEW in a pipeline SQL source"""
+    with open(path) as handle:
+        text = "\n".join(line for line in handle.read().splitlines() if not line.lstrip().startswith("--"))
+    for statement in text.split(";"):
+        match = _MATERIALIZED_VIEW.search(statement)
+        if not match:
+            continue
+        name, query = match.group(1), match.group(3)
+
+        def build(query=query):
+            # Materialize upstream datasets so LIVE.x resolves to their temp views
+            for upstream in _LIVE_REFERENCE.findall(query):
+                read(upstream)
+            return _session().sql(_LIVE_REFERENCE.sub(r"\1", query))
+
+        _register(name, "materialized view", build)
+
+
+def datasets():
+    """Registered dataset names in definition order"""
+    return list(_datasets)
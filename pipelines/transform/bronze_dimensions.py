@@ -1,13 +1,22 @@
 """
-Bronze Layer: Dimension Tables (Batch)
-Loads reference data for stores, vendors, shipments, products, and line items
+Bronze Layer: Dimension Tables (Incremental)
+Auto Loader picks up new or rewritten dimension files; CDC keeps one current row
+per key (SCD type 1), with SCD type 2 history for stores and vendors
+
+The store and vendor attributes shown downstream come from the current rows here:
+store_delay_metrics, vendor_performance and logistics_fact join stores_bronze /
+vendors_bronze by key as materialized views, which refresh incrementally from the
+row-level changes these tables record, so only the changed keys are recomputed.
 """
 import dlt
+import os
 import sys
+from pyspark.sql.functions import col
 
-# Add config path for DLT workspace imports
-sys.path.insert(0, '/Workspace/Users/kaustav.paul@databricks.com/ace-demo/pipelines')
+# Add config path for DLT workspace imports (PIPELINES_ROOT is set on the pipeline cluster)
+sys.path.insert(0, os.environ["PIPELINES_ROOT"])
 from config.config import (
+    DIMENSIONS_CHECKPOINT,
     DIMENSIONS_PATH,
     STORES_SCHEMA,
     VENDORS_SCHEMA,
@@ -17,82 +26,141 @@ from config.config import (
 )
 
 
-@dlt.table(
-    name="stores_bronze",
-    comment="Store locations and attributes",
-    table_properties={"quality": "bronze"}
-)
-def stores_bronze():
-    """ACE Hardware store master data with GPS coordinates and revenue"""
+# Row tracking and change data feed record which keys each update changed, so the
+# materialized views joining a dimension refresh only the rows of those keys
+DIMENSION_PROPERTIES = {
+    "quality": "bronze",
+    "delta.enableChangeDataFeed": "true",
+    "delta.enableRowTracking": "true"
+}
+
+
+def dimension_updates(file_prefix, schema):
+    """
+    Stream the rows of new or rewritten <file_prefix>*.csv files in DIMENSIONS_PATH.
+    Rows are sequenced by file modification time, so a newer file version wins.
+
+    A rewritten full export is re-read in full (allowOverwrites), so every row in it
+    goes through apply_changes again; unchanged keys are rewritten with the same
+    values. Dropping files that hold only new or changed rows avoids that cost.
+    """
     return (
-        spark.read
-        .format("csv")
+        spark.readStream
+        .format("cloudFiles")
+        .option("cloudFiles.format", "csv")
+        .option("cloudFiles.schemaLocation", f"{DIMENSIONS_CHECKPOINT}/{file_prefix}/")
+        # Re-read a file when it is overwritten in place (full dimension exports)
+        .option("cloudFiles.allowOverwrites", "true")
+        .option("pathGlobFilter", f"{file_prefix}*.csv*")
         .option("header", "true")
-        .schema(STORES_SCHEMA)
-        .load(f"{DIMENSIONS_PATH}/stores.csv")
+        .schema(schema)
+        .load(DIMENSIONS_PATH)
+        .withColumn("_ingested_at", col("_metadata.file_modification_time"))
     )
 
 
-@dlt.table(
-    name="vendors_bronze",
-    comment="Vendor master data with performance metrics",
-    table_properties={"quality": "bronze"}
+def upsert_dimension(target, source, keys, scd_type=1):
+    """Apply a dimension update stream to target, keyed by keys"""
+    dlt.apply_changes(
+        target=target,
+        source=source,
+        keys=keys,
+        sequence_by=col("_ingested_at"),
+        stored_as_scd_type=scd_type,
+        except_column_list=["_ingested_at"]
+    )
+
+
+# Stores
+
+@dlt.view(name="stores_updates")
+def stores_updates():
+    """ACE Hardware store master data with GPS coordinates and revenue"""
+    return dimension_updates("stores", STORES_SCHEMA)
+
+
+dlt.create_streaming_table(
+    name="stores_bronze",
+    comment="Store locations and attributes (current version per store)",
+    table_properties=DIMENSION_PROPERTIES
+)
+upsert_dimension("stores_bronze", "stores_updates", ["store_id"])
+
+# As-of attributes for ad hoc analysis; pipeline tables use the current version
+dlt.create_streaming_table(
+    name="stores_history",
+    comment="Store attribute history (SCD type 2, __START_AT/__END_AT validity)",
+    table_properties=DIMENSION_PROPERTIES
 )
-def vendors_bronze():
+upsert_dimension("stores_history", "stores_updates", ["store_id"], scd_type=2)
+
+
+# Vendors
+
+@dlt.view(name="vendors_updates")
+def vendors_updates():
     """Vendor information including on-time performance and risk tier"""
-    return (
-        spark.read
-        .format("csv")
-        .option("header", "true")
-        .schema(VENDORS_SCHEMA)
-        .load(f"{DIMENSIONS_PATH}/vendors.csv")
-    )
+    return dimension_updates("vendors", VENDORS_SCHEMA)
 
 
-@dlt.table(
+dlt.create_streaming_table(
+    name="vendors_bronze",
+    comment="Vendor master data with performance metrics (current version per vendor)",
+    table_properties=DIMENSION_PROPERTIES
+)
+upsert_dimension("vendors_bronze", "vendors_updates", ["vendor_id"])
+
+dlt.create_streaming_table(
+    name="vendors_history",
+    comment="Vendor attribute history (SCD type 2, __START_AT/__END_AT validity)",
+    table_properties=DIMENSION_PROPERTIES
+)
+upsert_dimension("vendors_history", "vendors_updates", ["vendor_id"], scd_type=2)
+
+
+# Shipments
+
+@dlt.view(name="shipments_updates")
+def shipments_updates():
+    """Shipment details including origin GPS, carrier, and planned arrival"""
+    return dimension_updates("shipments", SHIPMENTS_SCHEMA)
+
+
+dlt.create_streaming_table(
     name="shipments_bronze",
     comment="Shipment master data with origin and destination details",
-    table_properties={"quality": "bronze"}
+    table_properties=DIMENSION_PROPERTIES
 )
-def shipments_bronze():
-    """Shipment details including origin GPS, carrier, and planned arrival"""
-    return (
-        spark.read
-        .format("csv")
-        .option("header", "true")
-        .schema(SHIPMENTS_SCHEMA)
-        .load(f"{DIMENSIONS_PATH}/shipments.csv")
-    )
+upsert_dimension("shipments_bronze", "shipments_updates", ["shipment_id"])
+
+
+# Products
+
+@dlt.view(name="products_updates")
+def products_updates():
+    """Product master data including temperature control requirements"""
+    return dimension_updates("products", PRODUCTS_SCHEMA)
 
 
-@dlt.table(
+dlt.create_streaming_table(
     name="products_bronze",
     comment="Product catalog with categories and pricing",
-    table_properties={"quality": "bronze"}
+    table_properties=DIMENSION_PROPERTIES
 )
-def products_bronze():
-    """Product master data including temperature control requirements"""
-    return (
-        spark.read
-        .format("csv")
-        .option("header", "true")
-        .schema(PRODUCTS_SCHEMA)
-        .load(f"{DIMENSIONS_PATH}/products.csv")
-    )
+upsert_dimension("products_bronze", "products_updates", ["sku"])
 
 
-@dlt.table(
+# Shipment line items
+
+@dlt.view(name="shipment_line_items_updates")
+def shipment_line_items_updates():
+    """Detailed line items for each shipment with quantities and values"""
+    return dimension_updates("shipment_line_items", SHIPMENT_LINE_ITEMS_SCHEMA)
+
+
+dlt.create_streaming_table(
     name="shipment_line_items_bronze",
     comment="Shipment line-level details linking products to shipments",
-    table_properties={"quality": "bronze"}
+    table_properties=DIMENSION_PROPERTIES
 )
-def shipment_line_items_bronze():
-    """Detailed line items for each shipment with quantities and values"""
-    return (
-        spark.read
-        .format("csv")
-        .option("header", "true")
-        .schema(SHIPMENT_LINE_ITEMS_SCHEMA)
-        .load(f"{DIMENSIONS_PATH}/shipment_line_items.csv")
-    )
-
+upsert_dimension("shipment_line_items_bronze", "shipment_line_items_updates", ["shipment_id", "line_number"])
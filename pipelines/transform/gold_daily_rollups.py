@@ -0,0 +1,109 @@
+"""
+Gold Layer: Day-Grained Rollups
+Additive measures by date, so any N-day dashboard window sums a few pre-aggregated rows
+"""
+import dlt
+import os
+import sys
+from pyspark.sql.functions import coalesce, col, count, hll_sketch_agg, lit, sum as _sum, max as _max, when
+
+# Add config path for DLT workspace imports (PIPELINES_ROOT is set on the pipeline cluster)
+sys.path.insert(0, os.environ["PIPELINES_ROOT"])
+from config.config import HLL_LG_CONFIG_K
+
+
+ROLLUP_PROPERTIES = {
+    "quality": "gold",
+    "delta.enableChangeDataFeed": "true",
+    "delta.enableRowTracking": "true",
+}
+
+
+def distinct_sketch(column):
+    """HyperLogLog sketch of a column; merge with hll_union_agg, read with hll_sketch_estimate"""
+    return hll_sketch_agg(column, HLL_LG_CONFIG_K)
+
+
+def delayed_flag(threshold=0):
+    """1 for an event delayed by more than threshold minutes, else 0"""
+    return when(col("delay_minutes").isNotNull() & (col("delay_minutes") > threshold), 1).otherwise(0)
+
+
+@dlt.table(
+    name="daily_delivery_rollup",
+    comment="Deliveries per day by region, store, vendor, carrier and delay reason (additive measures)",
+    table_properties=ROLLUP_PROPERTIES,
+    cluster_by=["event_date", "region_id"]
+)
+def daily_delivery_rollup():
+    """
+    Day-grained delivery facts for time-windowed endpoints (delay causes, KPIs).
+    Every measure is a sum, count or max, so windows and coarser grains
+    roll up exactly; averages are total / count. Truck and shipment sketches
+    give approximate distinct counts for any slice via hll_union_agg.
+    """
+    return (
+        dlt.read("delivered_events")
+        .groupBy(
+            "event_date", "region_id", "store_id", "vendor_id",
+            "vendor_type", "carrier", "delay_reason"
+        )
+        .agg(
+            count("*").alias("deliveries"),
+            _sum(delayed_flag()).alias("delayed_deliveries"),
+            _sum(delayed_flag(60)).alias("severely_delayed_deliveries"),
+            _sum("delay_minutes").alias("total_delay_minutes"),
+            count("delay_minutes").alias("delay_reported_count"),
+            _max("delay_minutes").alias("max_delay_minutes"),
+            _sum("shipment_value").alias("total_shipment_value"),
+            _sum("temperature_celsius").alias("total_temperature"),
+            count("temperature_celsius").alias("temperature_reading_count"),
+            distinct_sketch("truck_id").alias("truck_sketch"),
+            distinct_sketch("shipment_id").alias("shipment_sketch")
+        )
+    )
+
+
+@dlt.table(
+    name="hourly_delivery_rollup",
+    comment="On-time vs delayed deliveries per day, hour and region",
+    table_properties=ROLLUP_PROPERTIES,
+    cluster_by=["event_date"]
+)
+def hourly_delivery_rollup():
+    """Hour-of-day delivery outcomes for the ETA accuracy chart"""
+    return (
+        dlt.read("delivered_events")
+        .groupBy("event_date", "event_hour", "region_id")
+        .agg(
+            count("*").alias("deliveries"),
+            _sum(delayed_flag()).alias("delayed_deliveries")
+        )
+    )
+
+
+@dlt.table(
+    name="daily_region_activity",
+    comment="Telemetry events per day, hour, region and event type with distinct-count sketches",
+    table_properties={"quality": "gold"},
+    cluster_by=["event_date", "region_id"]
+)
+def daily_region_activity():
+    """
+    Network activity for throughput, regional status and overview KPIs.
+    Event and delay measures are additive; truck, store and shipment sketches
+    merge across hours, days, regions and event types (~1.6% error at K=12).
+    """
+    return (
+        dlt.read("logistics_silver")
+        .groupBy("event_date", "event_hour", "region_id", "event_type")
+        .agg(
+            count("*").alias("events"),
+            _sum(delayed_flag()).alias("delayed_events"),
+            # Treats missing delays as 0, matching AVG(COALESCE(delay_minutes, 0))
+            _sum(coalesce(col("delay_minutes"), lit(0))).alias("total_delay_minutes"),
+            distinct_sketch("truck_id").alias("truck_sketch"),
+            distinct_sketch("store_id").alias("store_sketch"),
+            distinct_sketch("shipment_id").alias("shipment_sketch")
+        )
+    )
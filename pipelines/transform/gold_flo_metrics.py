@@ -3,77 +3,171 @@ Gold Layer: Business Metrics for FLO (Fulfillment & Logistics Optimization)
 Aggregated tables for analytics and dashboards
 """
 import dlt
-from pyspark.sql.functions import avg, col, count, sum as _sum, max as _max, when
+import os
+import sys
+from pyspark.sql.functions import (
+    acos, array_distinct, avg, coalesce, col, collect_list, collect_set, cos, count, countDistinct,
+    degrees, expr, flatten, greatest, least, lit, max_by, radians, round as _round, sin, size,
+    sum as _sum, max as _max, when
+)
+
+# Add config path for DLT workspace imports (PIPELINES_ROOT is set on the pipeline cluster)
+sys.path.insert(0, os.environ["PIPELINES_ROOT"])
+from config.config import SKEW_SALT_BUCKETS, SKEW_SPARK_CONF
+from transform.skew import salt
+
+
+# Gold aggregates only use mergeable measures (SUM, COUNT, MAX) over the
+# append-only delivered_events table, so materialized-view refresh can fold in
+# new rows per group instead of re-aggregating all history. Averages are
+# derived from stored sum/count pairs after the aggregation.
+INCREMENTAL_GOLD_PROPERTIES = {
+    "quality": "gold",
+    "delta.enableChangeDataFeed": "true",
+    "delta.enableRowTracking": "true",
+}
+
+
+def mean(total, n):
+    """Average from a stored sum/count pair (NULL when the count is zero, like AVG)"""
+    return when(col(n) > 0, col(total) / col(n))
+
+
+def is_delayed():
+    """1 for a delivery with a positive delay, else 0 (summed into delayed counts)"""
+    return when(col("delay_minutes").isNotNull() & (col("delay_minutes") > 0), 1).otherwise(0)
+
+
+# Silver columns read by the gold tables and the analytics layer
+DELIVERED_COLUMNS = [
+    # Event identifiers
+    "event_id", "truck_id", "shipment_id", "event_type",
+    "event_ts", "event_date", "event_hour", "ingest_date",
+    # Dimension keys (attributes are joined from the current stores_bronze / vendors_bronze)
+    "store_id", "region_id", "vendor_id", "vendor_type",
+    # Shipment context
+    "carrier", "origin_city", "origin_state", "planned_arrival_ts", "shipment_total_value",
+    # Event metrics
+    "delay_minutes", "delay_reason", "shipment_status", "temperature_celsius", "shipment_value",
+]
+
+
+@dlt.table(
+    name="delivered_events",
+    comment="DELIVERED events from silver, narrowed to the columns used by gold and analytics",
+    table_properties=INCREMENTAL_GOLD_PROPERTIES
+)
+def delivered_events():
+    """
+    Shared input for every gold aggregate and logistics_fact.
+    Streams from silver, so each update filters only newly arrived events
+    and silver is scanned once instead of once per downstream table.
+    """
+    return (
+        dlt.read_stream("logistics_silver")
+        .filter(col("event_type") == "DELIVERED")
+        .select(*DELIVERED_COLUMNS)
+    )
 
 
 @dlt.table(
     name="store_delay_metrics",
     comment="Store-level delay analysis for stockout risk assessment",
-    table_properties={"quality": "gold"}
+    table_properties=INCREMENTAL_GOLD_PROPERTIES
 )
 def store_delay_metrics():
     """
     Aggregates delivery performance by store for FLO risk modeling.
     Supports: Stockout prediction, store performance dashboards
+
+    Grouped by store_id alone: silver keeps the store attributes current at
+    ingestion, so grouping by them would split a store once it changes.
+    Attributes are joined from the current stores_bronze rows by key, so a
+    store update refreshes only that store's row.
     """
-    delivered = dlt.read("logistics_silver").filter(col("event_type") == "DELIVERED")
+    delivered = dlt.read("delivered_events")
+    stores = dlt.read("stores_bronze").select(
+        "store_id",
+        "store_name",
+        col("city").alias("store_city"),
+        col("state").alias("store_state"),
+        "region_id",
+        col("latitude").alias("store_latitude"),
+        col("longitude").alias("store_longitude"),
+        col("weekly_revenue").alias("store_weekly_revenue")
+    )
     
-    return (
+    metrics = (
         delivered
-        .groupBy(
-            "store_id", "store_name", "store_city", "store_state",
-            "region_id", "store_latitude", "store_longitude", "store_weekly_revenue"
-        )
+        .groupBy("store_id")
         .agg(
             count("*").alias("total_deliveries"),
             # Delay metrics (delay_minutes is NULL for on-time deliveries)
             _sum("delay_minutes").alias("total_delay_minutes"),
-            avg("delay_minutes").alias("avg_delay_minutes"),
+            count("delay_minutes").alias("delay_reported_count"),
             _max("delay_minutes").alias("max_delay_minutes"),
             # Count only delayed shipments (where delay_minutes IS NOT NULL and > 0)
-            _sum(when(col("delay_minutes").isNotNull() & (col("delay_minutes") > 0), 1).otherwise(0)).alias("delayed_shipments"),
+            _sum(is_delayed()).alias("delayed_shipments"),
             _sum("shipment_value").alias("total_shipment_value"),
-            avg("temperature_celsius").alias("avg_temperature")
+            _sum("temperature_celsius").alias("total_temperature"),
+            count("temperature_celsius").alias("temperature_reading_count")
         )
+        .withColumn("avg_delay_minutes", mean("total_delay_minutes", "delay_reported_count"))
+        .withColumn("avg_temperature", mean("total_temperature", "temperature_reading_count"))
     )
+    
+    return stores.join(metrics, "store_id", "right")
 
 
 @dlt.table(
     name="vendor_performance",
     comment="Vendor on-time performance and delivery metrics by region",
-    table_properties={"quality": "gold"}
+    table_properties=INCREMENTAL_GOLD_PROPERTIES
 )
 def vendor_performance():
     """
     Vendor scorecarding for supplier management.
     Supports: Vendor selection, contract negotiation, risk mitigation
+
+    Grouped by vendor_id and region_id only; name, type and risk tier come
+    from the current vendors_bronze rows (see store_delay_metrics).
     """
-    delivered = dlt.read("logistics_silver").filter(col("event_type") == "DELIVERED")
+    delivered = dlt.read("delivered_events")
+    vendors = dlt.read("vendors_bronze").select(
+        "vendor_id",
+        "vendor_name",
+        "vendor_type",
+        col("risk_tier").alias("vendor_risk_tier")
+    )
     
-    return (
+    metrics = (
         delivered
-        .groupBy("vendor_id", "vendor_name", "vendor_type", "vendor_risk_tier", "region_id")
+        .groupBy("vendor_id", "region_id")
         .agg(
             count("*").alias("total_deliveries"),
             # Count only delayed deliveries (where delay_minutes IS NOT NULL and > 0)
-            _sum(when(col("delay_minutes").isNotNull() & (col("delay_minutes") > 0), 1).otherwise(0)).alias("delayed_deliveries"),
-            avg("delay_minutes").alias("avg_delay_minutes"),
+            _sum(is_delayed()).alias("delayed_deliveries"),
+            _sum("delay_minutes").alias("total_delay_minutes"),
+            count("delay_minutes").alias("delay_reported_count"),
             _sum("shipment_value").alias("total_value_delivered")
         )
+        .withColumn("avg_delay_minutes", mean("total_delay_minutes", "delay_reported_count"))
     )
+    
+    return vendors.join(metrics, "vendor_id", "right")
 
 
 @dlt.table(
     name="carrier_performance",
     comment="Carrier comparison metrics for logistics optimization",
-    table_properties={"quality": "gold"}
+    table_properties=INCREMENTAL_GOLD_PROPERTIES
 )
 def carrier_performance():
     """
     Carrier benchmarking for route optimization and contract decisions.
     Supports: Carrier selection, cost optimization, SLA monitoring
     """
-    delivered = dlt.read("logistics_silver").filter(col("event_type") == "DELIVERED")
+    delivered = dlt.read("delivered_events")
     
     return (
         delivered
@@ -81,18 +175,22 @@ def carrier_performance():
         .agg(
             count("*").alias("total_deliveries"),
             # Count only delayed deliveries (where delay_minutes IS NOT NULL and > 0)
-            _sum(when(col("delay_minutes").isNotNull() & (col("delay_minutes") > 0), 1).otherwise(0)).alias("delayed_deliveries"),
-            avg("delay_minutes").alias("avg_delay_minutes"),
+            _sum(is_delayed()).alias("delayed_deliveries"),
+            _sum("delay_minutes").alias("total_delay_minutes"),
+            count("delay_minutes").alias("delay_reported_count"),
             _max("delay_minutes").alias("max_delay_minutes"),
             _sum("shipment_value").alias("total_value_delivered")
         )
+        .withColumn("avg_delay_minutes", mean("total_delay_minutes", "delay_reported_count"))
     )
 
 
 @dlt.table(
     name="product_category_metrics",
     comment="Product category delivery analysis with temperature monitoring",
-    table_properties={"quality": "gold"}
+    table_properties={"quality": "gold"},
+    # Batch shuffle join on shipment_id: let AQE split partitions skewed by hub shipments
+    spark_conf=SKEW_SPARK_CONF
 )
 def product_category_metrics():
     """
@@ -112,24 +210,252 @@ def product_category_metrics():
         "p.category", "p.requires_temp_control"
     )
     
-    # Join with delivered telemetry
-    delivered = dlt.read("logistics_silver").filter(col("event_type") == "DELIVERED")
+    # Roll line items up to one row per shipment and category before the join,
+    # so the shuffle carries shipments rather than individual line items
+    shipment_items = (
+        enriched_items
+        .groupBy("shipment_id", "category", "requires_temp_control")
+        .agg(
+            _sum("quantity").alias("units"),
+            _sum("line_total").alias("value"),
+            count("*").alias("line_items")
+        )
+    )
+    
+    # One delivered row per shipment (latest DELIVERED event), so repeated
+    # DELIVERED events cannot double count a shipment's line items
+    deliveries = (
+        dlt.read("delivered_events")
+        .groupBy("shipment_id")
+        .agg(
+            max_by("region_id", "event_ts").alias("region_id"),
+            max_by("delay_minutes", "event_ts").alias("delay_minutes"),
+            max_by("temperature_celsius", "event_ts").alias("temperature_celsius")
+        )
+    )
     
-    product_delivery = enriched_items.alias("items").join(
-        delivered.alias("d"),
+    product_delivery = shipment_items.alias("items").join(
+        deliveries.alias("d"),
         col("items.shipment_id") == col("d.shipment_id"),
         "inner"
     )
     
+    # Delay and temperature averages stay per line item: each shipment's
+    # reading is weighted by its line-item count
     return (
         product_delivery
         .groupBy("category", "region_id", "requires_temp_control")
         .agg(
-            _sum("quantity").alias("total_units_shipped"),
-            _sum("line_total").alias("total_value_shipped"),
-            count("*").alias("line_items_delivered"),
-            avg("d.delay_minutes").alias("avg_delivery_delay"),
-            avg("d.temperature_celsius").alias("avg_temperature")
+            _sum("units").alias("total_units_shipped"),
+            _sum("value").alias("total_value_shipped"),
+            _sum("line_items").alias("line_items_delivered"),
+            _sum(col("d.delay_minutes") * col("line_items")).alias("_delay_total"),
+            _sum(when(col("d.delay_minutes").isNotNull(), col("line_items"))).alias("_delay_count"),
+            _sum(col("d.temperature_celsius") * col("line_items")).alias("_temperature_total"),
+            _sum(when(col("d.temperature_celsius").isNotNull(), col("line_items"))).alias("_temperature_count")
         )
+        .withColumn("avg_delivery_delay", mean("_delay_total", "_delay_count"))
+        .withColumn("avg_temperature", mean("_temperature_total", "_temperature_count"))
+        .drop("_delay_total", "_delay_count", "_temperature_total", "_temperature_count")
     )
 
+
+@dlt.table(
+    name="store_risk_scores",
+    comment="Per-store stockout risk score, tier, revenue at risk and primary delay reason",
+    table_properties={"quality": "gold"}
+)
+def store_risk_scores():
+    """
+    Store risk ranking served by the Risk Analysis tab.
+    Scores stores on delay rate, average and peak delay, and delayed volume (25-100 scale).
+    """
+    # Most frequent delay reason per store across in-flight and delivered events
+    primary_reasons = (
+        dlt.read("logistics_silver")
+        .filter(
+            col("event_type").isin("DELIVERED", "IN_TRANSIT", "OUT_FOR_DELIVERY")
+            & col("delay_reason").isNotNull()
+            & (col("delay_reason") != "NONE")
+            & (col("delay_minutes") > 0)
+        )
+        .groupBy("store_id", "delay_reason")
+        .agg(count("*").alias("reason_count"))
+        .groupBy("store_id")
+        .agg(max_by("delay_reason", "reason_count").alias("primary_delay_reason"))
+    )
+    
+    metrics = dlt.read("store_delay_metrics").filter(col("total_deliveries") >= 2)
+    delay_rate = col("delayed_shipments") / greatest(col("total_deliveries"), lit(1))
+    
+    risk_score = least(
+        _round(
+            # Base risk (25-45 range based on delay rate)
+            lit(25) + delay_rate * 20
+            # Average delay component (0-25 range, capped at 300 min for outliers)
+            + least(coalesce(col("avg_delay_minutes"), lit(0)), lit(300)) / 300.0 * 25
+            # Max delay spike component (0-20 range, capped at 480 min)
+            + least(coalesce(col("max_delay_minutes"), lit(0)), lit(480)) / 480.0 * 20
+            # Volume penalty: high-volume stores with delays are riskier (0-10 range)
+            + when((col("total_deliveries") > 100) & (delay_rate > 0.3), 10)
+            .when((col("total_deliveries") > 50) & (delay_rate > 0.4), 5)
+            .otherwise(0),
+            0
+        ),
+        lit(100)
+    ).cast("int")
+    
+    revenue_at_risk = _round(
+        col("total_shipment_value") / greatest(col("total_deliveries"), lit(1))
+        * col("total_deliveries") * 0.08 * (1 + delay_rate * 0.5),
+        2
+    ).cast("decimal(18,2)")
+    
+    return (
+        metrics.alias("m")
+        .join(primary_reasons.alias("r"), col("m.store_id") == col("r.store_id"), "left")
+        .select(
+            col("m.store_id"),
+            col("m.store_city"),
+            col("m.region_id"),
+            col("m.total_deliveries"),
+            col("m.delayed_shipments"),
+            delay_rate.cast("double").alias("delay_rate"),
+            risk_score.alias("risk_score"),
+            coalesce(col("r.primary_delay_reason"), lit("OPERATIONAL")).alias("primary_delay_reason"),
+            revenue_at_risk.alias("revenue_at_risk")
+        )
+        .withColumn(
+            "risk_tier",
+            when(col("risk_score") >= 80, "CRITICAL")
+            .when(col("risk_score") >= 65, "HIGH")
+            .when(col("risk_score") >= 45, "MEDIUM")
+            .otherwise("LOW")
+        )
+    )
+
+
+# RSCs shipping at least this many shipments count as major hubs
+MAJOR_RSC_MIN_SHIPMENTS = 20
+
+# Same great-circle convention as the dashboard: 111.045 km per degree of arc
+KM_PER_DEGREE = 111.045
+
+
+def route_distance_km():
+    """Great-circle distance from a shipment's origin RSC to its destination store"""
+    cosine = (
+        cos(radians(col("origin_latitude"))) * cos(radians(col("store_latitude")))
+        * cos(radians(col("origin_longitude")) - radians(col("store_longitude")))
+        + sin(radians(col("origin_latitude"))) * sin(radians(col("store_latitude")))
+    )
+    return KM_PER_DEGREE * degrees(acos(least(lit(1.0), greatest(lit(-1.0), cosine))))
+
+
+@dlt.table(
+    name="rsc_metrics",
+    comment="Per-RSC (shipment origin) location, volume, routes, stores served and average route distance",
+    table_properties={"quality": "gold"}
+)
+def rsc_metrics():
+    """
+    One row per RSC for the Location Monitor map and RSC statistics.
+    Route, store and distance measures cover trucked in-flight and delivered events.
+    """
+    routed = (
+        col("truck_id").isNotNull()
+        & col("event_type").isin("IN_TRANSIT", "OUT_FOR_DELIVERY", "DELIVERED")
+    )
+    events = dlt.read("logistics_silver").filter(col("origin_city").isNotNull())
+    
+    if SKEW_SALT_BUCKETS <= 1:
+        rscs = (
+            events
+            .groupBy("origin_city")
+            .agg(
+                _max("origin_state").alias("origin_state"),
+                _max("origin_latitude").alias("origin_latitude"),
+                _max("origin_longitude").alias("origin_longitude"),
+                countDistinct("shipment_id").alias("shipment_count"),
+                countDistinct(when(routed, col("truck_id"))).alias("active_routes"),
+                countDistinct(when(routed, col("store_id"))).alias("stores_served"),
+                avg(when(routed, route_distance_km())).alias("avg_distance_km")
+            )
+        )
+    else:
+        # Major hubs hold most events: aggregate per (origin_city, shipment salt) first so
+        # a hub is split over SKEW_SALT_BUCKETS tasks, then merge the small partials.
+        # Shipments never span salts, so per-salt distinct shipment counts add up exactly;
+        # trucks and stores can, so their (small) distinct sets are merged instead.
+        partials = (
+            events
+            .groupBy("origin_city", salt("shipment_id", SKEW_SALT_BUCKETS).alias("_salt"))
+            .agg(
+                _max("origin_state").alias("origin_state"),
+                _max("origin_latitude").alias("origin_latitude"),
+                _max("origin_longitude").alias("origin_longitude"),
+                countDistinct("shipment_id").alias("shipment_count"),
+                collect_set(when(routed, col("truck_id"))).alias("trucks"),
+                collect_set(when(routed, col("store_id"))).alias("stores"),
+                _sum(when(routed, route_distance_km())).alias("total_distance_km"),
+                count(when(routed, route_distance_km())).alias("distance_count")
+            )
+        )
+        rscs = (
+            partials
+            .groupBy("origin_city")
+            .agg(
+                _max("origin_state").alias("origin_state"),
+                _max("origin_latitude").alias("origin_latitude"),
+                _max("origin_longitude").alias("origin_longitude"),
+                _sum("shipment_count").alias("shipment_count"),
+                size(array_distinct(flatten(collect_list("trucks")))).cast("long").alias("active_routes"),
+                size(array_distinct(flatten(collect_list("stores")))).cast("long").alias("stores_served"),
+                _sum("total_distance_km").alias("total_distance_km"),
+                _sum("distance_count").alias("distance_count")
+            )
+            .withColumn("avg_distance_km", mean("total_distance_km", "distance_count"))
+            .drop("total_distance_km", "distance_count")
+        )
+    
+    return rscs.withColumn("is_major", col("shipment_count") >= MAJOR_RSC_MIN_SHIPMENTS)
+
+
+@dlt.table(
+    name="network_summary",
+    comment="Single-row network statistics for the Location Monitor page",
+    table_properties={"quality": "gold"}
+)
+def network_summary():
+    """Store coverage, at-risk stores, delivery lead time and RSC counts across the network"""
+    stores = (
+        dlt.read("logistics_silver")
+        .filter(col("store_id").isNotNull())
+        .agg(
+            countDistinct("store_id").alias("total_stores"),
+            countDistinct(when(col("store_is_active"), col("store_id"))).alias("active_stores"),
+            countDistinct("store_state").alias("states_covered"),
+            countDistinct(when(col("delay_minutes") > 120, col("store_id"))).alias("at_risk_stores"),
+            avg(
+                when(
+                    col("planned_departure_ts").isNotNull() & col("planned_arrival_ts").isNotNull(),
+                    expr("TIMESTAMPDIFF(DAY, planned_departure_ts, planned_arrival_ts)")
+                )
+            ).alias("avg_delivery_days")
+        )
+        .withColumn(
+            "coverage_percent",
+            _round(when(col("total_stores") > 0, col("active_stores") * 100.0 / col("total_stores")), 1)
+        )
+        .withColumn("avg_delivery_days", _round(col("avg_delivery_days"), 1))
+    )
+    
+    rscs = (
+        dlt.read("rsc_metrics")
+        .agg(
+            count("*").alias("total_rscs"),
+            _sum(when(col("is_major"), 1).otherwise(0)).alias("major_rscs")
+        )
+    )
+    
+    return stores.crossJoin(rscs)
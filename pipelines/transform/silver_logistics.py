@@ -1,9 +1,25 @@
 """
 Silver Layer: Enriched Logistics Telemetry
-Joins telemetry with dimensions and applies data quality rules
+Streams new telemetry through stream-static joins with dimensions and applies data quality rules
 """
 import dlt
-from pyspark.sql.functions import coalesce, col
+import os
+import sys
+from pyspark.sql.functions import broadcast, coalesce, col, hour, to_date
+
+# Add config path for DLT workspace imports (PIPELINES_ROOT is set on the pipeline cluster)
+sys.path.insert(0, os.environ["PIPELINES_ROOT"])
+from config.config import (
+    AUTO_OPTIMIZE_PROPERTIES,
+    BROADCAST_DIMENSIONS,
+    BROADCAST_JOIN_THRESHOLD,
+    EVENT_LATENESS_THRESHOLD,
+    SALT_SHIPMENT_JOIN,
+    SILVER_CLUSTER_BY,
+    SKEW_SALT_BUCKETS,
+    SLIM_CLUSTER_BY
+)
+from transform.skew import replicate_salts, salt
 
 
 # Data Quality Expectations
@@ -17,13 +33,25 @@ QUALITY_RULES = {
 }
 
 
+def read_dimension(name):
+    """Static dimension snapshot, broadcast when listed in BROADCAST_DIMENSIONS"""
+    dimension = dlt.read(name)
+    return broadcast(dimension) if name in BROADCAST_DIMENSIONS else dimension
+
+
 @dlt.table(
     name="logistics_silver",
-    comment="Enriched logistics telemetry with store, vendor, and shipment context",
+    comment="Enriched logistics telemetry with store, vendor, and shipment context (streaming, incremental)",
     table_properties={
         "quality": "silver",
-        "pipelines.reset.allowed": "true"
-    }
+        "pipelines.reset.allowed": "true",
+        **AUTO_OPTIMIZE_PROPERTIES
+    },
+    # Scoped to this flow rather than set on the shared pipeline session
+    spark_conf={
+        "spark.sql.autoBroadcastJoinThreshold": str(BROADCAST_JOIN_THRESHOLD)
+    },
+    cluster_by=SILVER_CLUSTER_BY
 )
 @dlt.expect_or_drop("store_id_not_null", QUALITY_RULES["store_id_not_null"])
 @dlt.expect_or_drop("vendor_id_not_null", QUALITY_RULES["vendor_id_not_null"])
@@ -38,17 +66,43 @@ def logistics_silver():
     - Vendor performance metrics
     - Shipment details (origin, carrier, value)
     - Data quality enforced via expectations
+
+    Telemetry is read as a stream, so each update only enriches the events in
+    newly ingested Auto Loader files. Dimensions are joined as static snapshots
+    (stream-static join): each micro-batch sees the latest dimension version,
+    and rows already written are not re-enriched when a dimension changes.
+
+    Re-delivered events are dropped by event_id within EVENT_LATENESS_THRESHOLD
+    of event time; the watermark bounds the dedup state. Events further behind the
+    watermark are dropped too; see ingested_within_lateness on logistics_bronze.
     """
-    # Read source tables
-    telemetry = dlt.read("logistics_bronze").alias("t")
-    shipments = dlt.read("shipments_bronze").alias("s")
-    stores = dlt.read("stores_bronze").alias("st")
-    vendors = dlt.read("vendors_bronze").alias("v")
+    # Incremental source: only new bronze rows since the last checkpoint
+    telemetry = (
+        dlt.read_stream("logistics_bronze")
+        .withWatermark("event_ts", EVENT_LATENESS_THRESHOLD)
+        .dropDuplicatesWithinWatermark(["event_id"])
+        .alias("t")
+    )
+
+    # Static dimension snapshots for stream-static joins; broadcasting the small ones
+    # keeps those joins map-side. Shipments are broadcast only below the threshold.
+    shipments = read_dimension("shipments_bronze").alias("s")
+    stores = read_dimension("stores_bronze").alias("st")
+    vendors = read_dimension("vendors_bronze").alias("v")
+    shipment_match = col("t.shipment_id") == col("s.shipment_id")
+
+    # Opt-in (SALT_SHIPMENT_JOIN) for feeds where single shipments carry most events:
+    # salt telemetry by event_id and replicate shipments per salt to spread hot
+    # shipment_ids over tasks of the shuffled join
+    if SALT_SHIPMENT_JOIN and "shipments_bronze" not in BROADCAST_DIMENSIONS and SKEW_SALT_BUCKETS > 1:
+        telemetry = telemetry.withColumn("_salt", salt("event_id", SKEW_SALT_BUCKETS)).alias("t")
+        shipments = replicate_salts(shipments, SKEW_SALT_BUCKETS).alias("s")
+        shipment_match = shipment_match & (col("t._salt") == col("s._salt"))
 
     # Enrich telemetry with shipment details
     enriched = telemetry.join(
         shipments,
-        col("t.shipment_id") == col("s.shipment_id"),
+        shipment_match,
         "left"
     ).select(
         # Core telemetry fields
@@ -60,6 +114,9 @@ def logistics_silver():
         coalesce(col("t.vendor_id"), col("s.vendor_id")).alias("vendor_id"),
         col("t.vendor_type"),
         col("t.event_ts"),
+        # Materialized date/hour so dashboard filters and clustering avoid DATE()/HOUR() on event_ts
+        to_date(col("t.event_ts")).alias("event_date"),
+        hour(col("t.event_ts")).alias("event_hour"),
         col("t.latitude"),
         col("t.longitude"),
         col("t.estimated_arrival_ts"),
@@ -112,3 +169,80 @@ def logistics_silver():
         col("v.on_time_pct").alias("vendor_on_time_pct")
     )
 
+
+@dlt.table(
+    name="logistics_dashboard_slim",
+    comment="Narrow projection of logistics_silver with the columns the dashboard API reads (streaming)",
+    table_properties={
+        "quality": "silver",
+        **AUTO_OPTIMIZE_PROPERTIES
+    },
+    cluster_by=SLIM_CLUSTER_BY
+)
+def logistics_dashboard_slim():
+    """
+    Event-level store context for dashboard queries without a gold aggregate
+    (row counts). Store locations come from stores_bronze, one row per store.
+    Drops the wide vendor, shipment, event and planned-timestamp context and
+    narrows numeric types: coordinates and revenue to float (~1 m precision
+    is plenty for the map).
+    """
+    return (
+        dlt.read_stream("logistics_silver")
+        .select(
+            "store_id",
+            "store_city",
+            "store_state",
+            col("store_latitude").cast("float").alias("store_latitude"),
+            col("store_longitude").cast("float").alias("store_longitude"),
+            col("store_weekly_revenue").cast("float").alias("store_weekly_revenue"),
+            "store_is_active"
+        )
+    )
+
+
+# Events that move a truck; the latest one per truck is its current state
+TRUCK_MOVEMENT_EVENTS = ["DEPARTED_WAREHOUSE", "IN_TRANSIT", "OUT_FOR_DELIVERY"]
+
+
+@dlt.view(
+    name="truck_position_updates",
+    comment="Positioned truck movement events streamed from silver"
+)
+def truck_position_updates():
+    """CDC feed for truck_current_state: one change row per truck movement event"""
+    return (
+        dlt.read_stream("logistics_silver")
+        .filter(
+            col("truck_id").isNotNull()
+            & col("latitude").isNotNull()
+            & col("longitude").isNotNull()
+            & col("event_type").isin(TRUCK_MOVEMENT_EVENTS)
+        )
+        .select(
+            "truck_id", "shipment_id", "event_type", "event_ts",
+            "latitude", "longitude", "region_id",
+            "origin_city", "store_id", "store_city",
+            "estimated_arrival_ts", "delay_minutes",
+            "shipment_value", "shipment_total_value"
+        )
+    )
+
+
+dlt.create_streaming_table(
+    name="truck_current_state",
+    comment="Latest movement event per truck (one row per truck) for fleet and live-map endpoints",
+    table_properties={
+        "quality": "silver",
+        **AUTO_OPTIMIZE_PROPERTIES
+    }
+)
+
+# Upsert keyed by truck_id; out-of-order events never overwrite a newer position
+dlt.apply_changes(
+    target="truck_current_state",
+    source="truck_position_updates",
+    keys=["truck_id"],
+    sequence_by=col("event_ts"),
+    stored_as_scd_type=1
+)
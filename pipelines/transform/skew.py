@@ -0,0 +1,36 @@
+"""
+Skew Helpers: salting and hot-key detection for hub-dominated keys
+Shared by the silver and gold transforms (defines no tables)
+"""
+from pyspark.sql.functions import col, count, explode, lit, pmod, sequence, xxhash64
+
+
+def salt(column, buckets):
+    """
+    Deterministic salt in [0, buckets) hashed from column.
+    Salting on a finer key than the grouping key (e.g. shipment_id under
+    origin_city) spreads a hot group over buckets tasks, and keeps exact
+    distinct counts of that column additive across salts.
+    """
+    return pmod(xxhash64(col(column)), lit(buckets))
+
+
+def replicate_salts(df, buckets, name="_salt"):
+    """Copy every row of the small join side once per salt so each salted key still matches"""
+    return df.withColumn(name, explode(sequence(lit(0), lit(buckets - 1))))
+
+
+def key_skew(df, key):
+    """
+    Rows per key summary: (keys, max_rows, median_rows, ratio).
+    A ratio well above SKEWED_PARTITION_FACTOR means the key will produce straggler tasks.
+    """
+    counts = df.groupBy(key).agg(count("*").alias("rows"))
+    stats = counts.selectExpr(
+        "count(*) AS keys",
+        "max(rows) AS max_rows",
+        "percentile_approx(rows, 0.5) AS median_rows"
+    ).first()
+    if not stats or not stats["keys"]:
+        return 0, 0, 0, 0.0
+    return stats["keys"], stats["max_rows"], stats["median_rows"], stats["max_rows"] / max(stats["median_rows"], 1)
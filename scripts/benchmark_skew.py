@@ -0,0 +1,179 @@
+"""
+Skew benchmark: task time balance of hub-keyed shuffles with and without mitigation.
+
+Runs the RSC aggregate (grouped by origin_city) and the silver enrichment join
+(telemetry to shipments on shipment_id, then broadcast stores and vendors) on
+local-mode PySpark over generate_data.py output, plain and with each mitigation on
+its own (salting, or adaptive skew join), and prints the key skew of each shuffle key
+and per-stage task time balance (max / median).
+
+    python scripts/generate_data.py --num-shipments 20000 --num-events 20000 --output-dir data
+    python scripts/benchmark_skew.py --data-dir data
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from urllib.request import urlopen
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import (
+    array_distinct, avg, broadcast, col, collect_list, collect_set, count, countDistinct, flatten,
+    size, sum as _sum, when
+)
+
+PIPELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pipelines")
+sys.path.insert(0, PIPELINES_DIR)
+from config.config import (  # noqa: E402
+    LOGISTICS_SCHEMA, SHIPMENTS_SCHEMA, SKEW_SALT_BUCKETS, SKEW_SPARK_CONF, STORES_SCHEMA, VENDORS_SCHEMA
+)
+from transform.skew import key_skew, replicate_salts, salt  # noqa: E402
+
+
+def read_csv(spark, path, schema):
+    return spark.read.option("header", "true").schema(schema).csv(path).cache()
+
+
+def read_inputs(spark, data_dir):
+    dimensions = os.path.join(data_dir, "dimensions")
+    return (
+        read_csv(spark, os.path.join(data_dir, "telemetry", "logistics_telemetry.csv"), LOGISTICS_SCHEMA),
+        read_csv(spark, os.path.join(dimensions, "shipments.csv"), SHIPMENTS_SCHEMA),
+        read_csv(spark, os.path.join(dimensions, "stores.csv"), STORES_SCHEMA),
+        read_csv(spark, os.path.join(dimensions, "vendors.csv"), VENDORS_SCHEMA),
+    )
+
+
+@contextmanager
+def session_conf(spark, conf):
+    """Apply conf for one run only, restoring the previous values afterwards"""
+    previous = {key: spark.conf.get(key, None) for key in conf}
+    for key, value in conf.items():
+        spark.conf.set(key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                spark.conf.unset(key)
+            else:
+                spark.conf.set(key, value)
+
+
+def rsc_aggregate(events, shipments, buckets):
+    """Per-origin aggregate shaped like rsc_metrics; buckets > 1 pre-aggregates per shipment salt"""
+    routed = col("truck_id").isNotNull() & col("event_type").isin("IN_TRANSIT", "OUT_FOR_DELIVERY", "DELIVERED")
+    enriched = events.join(shipments.select("shipment_id", "origin_city"), "shipment_id")
+    if buckets <= 1:
+        return enriched.groupBy("origin_city").agg(
+            countDistinct("shipment_id").alias("shipment_count"),
+            countDistinct(when(routed, col("truck_id"))).alias("active_routes"),
+            avg("delay_minutes").alias("avg_delay")
+        )
+    partials = enriched.groupBy("origin_city", salt("shipment_id", buckets).alias("_salt")).agg(
+        countDistinct("shipment_id").alias("shipment_count"),
+        collect_set(when(routed, col("truck_id"))).alias("trucks"),
+        _sum("delay_minutes").alias("total_delay"),
+        count("delay_minutes").alias("delay_count")
+    )
+    return partials.groupBy("origin_city").agg(
+        _sum("shipment_count").alias("shipment_count"),
+        size(array_distinct(flatten(collect_list("trucks")))).alias("active_routes"),
+        (_sum("total_delay") / _sum("delay_count")).alias("avg_delay")
+    )
+
+
+def silver_enrichment(events, shipments, stores, vendors, buckets):
+    """
+    logistics_silver's joins: telemetry to shipments shuffled on shipment_id (as once
+    shipments outgrow the broadcast threshold), salted when buckets > 1 as with
+    SALT_SHIPMENT_JOIN, then the broadcast store and vendor dimensions
+    """
+    shipments = shipments.drop("vendor_id", "store_id", "carrier")
+    if buckets <= 1:
+        enriched = events.join(shipments, "shipment_id", "left")
+    else:
+        events = events.withColumn("_salt", salt("event_id", buckets))
+        enriched = events.join(replicate_salts(shipments, buckets), ["shipment_id", "_salt"], "left").drop("_salt")
+    stores = stores.select("store_id", "store_name", col("city").alias("store_city"), "is_active", "weekly_revenue")
+    vendors = vendors.select("vendor_id", "vendor_name", "risk_tier")
+    return enriched.join(broadcast(stores), "store_id", "left").join(broadcast(vendors), "vendor_id", "left")
+
+
+def stage_balance(spark, group):
+    """(stage_id, tasks, median_ms, max_ms) for every shuffle-reading stage of a job group"""
+    sc = spark.sparkContext
+    tracker = sc.statusTracker()
+    base = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}"
+    results = []
+    for job_id in tracker.getJobIdsForGroup(group):
+        for stage_id in tracker.getJobInfo(job_id).stageIds:
+            try:
+                with urlopen(f"{base}/stages/{stage_id}") as response:
+                    attempts = json.load(response)
+            except OSError:
+                continue  # stage skipped (its shuffle output was reused)
+            for attempt in attempts:
+                if attempt.get("status") != "COMPLETE" or not attempt.get("shuffleReadBytes"):
+                    continue
+                url = f"{base}/stages/{stage_id}/{attempt['attemptId']}/taskList?length=100000"
+                with urlopen(url) as response:
+                    tasks = json.load(response)
+                times = [task["taskMetrics"]["executorRunTime"] for task in tasks if task.get("taskMetrics")]
+                if times:
+                    results.append((stage_id, len(times), statistics.median(times), max(times)))
+    return results
+
+
+def run(spark, name, df):
+    spark.sparkContext.setJobGroup(name, name)
+    start = time.perf_counter()
+    df.write.format("noop").mode("overwrite").save()
+    elapsed = time.perf_counter() - start
+    print(f"\n{name}: {elapsed:.2f}s wall")
+    for stage_id, tasks, median_ms, max_ms in stage_balance(spark, name):
+        ratio = max_ms / median_ms if median_ms else float("inf")
+        print(f"  stage {stage_id:>4}  tasks {tasks:>4}  median {median_ms:>7.0f} ms  max {max_ms:>7.0f} ms  max/median {ratio:5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skew mitigation for hub-keyed aggregates and joins.")
+    parser.add_argument("--data-dir", type=str, default="data")
+    parser.add_argument("--salt-buckets", type=int, default=max(SKEW_SALT_BUCKETS, 2))
+    parser.add_argument("--shuffle-partitions", type=int, default=32)
+    parser.add_argument("--master", type=str, default="local[4]")
+    args = parser.parse_args()
+
+    spark = (
+        SparkSession.builder.master(args.master).appName("skew-benchmark")
+        .config("spark.sql.shuffle.partitions", str(args.shuffle_partitions))
+        .config("spark.sql.autoBroadcastJoinThreshold", "-1")
+        .config("spark.sql.adaptive.enabled", "false")
+        .getOrCreate()
+    )
+    events, shipments, stores, vendors = read_inputs(spark, args.data_dir)
+
+    # Shuffle keys of the RSC aggregate and of the silver shipment join
+    for key, df in (("origin_city", events.join(shipments, "shipment_id")), ("shipment_id", events)):
+        keys, max_rows, median_rows, ratio = key_skew(df, key)
+        print(f"{key} skew: {keys} keys, max {max_rows} rows, median {median_rows} rows, max/median {ratio:.1f}")
+
+    # The session has AQE off, so each run measures one strategy; the adaptive run
+    # enables it for that run alone, without partition coalescing so its task
+    # balance compares with the others
+    run(spark, "rsc aggregate (plain)", rsc_aggregate(events, shipments, 1))
+    run(spark, f"rsc aggregate (salted x{args.salt_buckets})", rsc_aggregate(events, shipments, args.salt_buckets))
+    run(spark, "silver enrichment (plain)", silver_enrichment(events, shipments, stores, vendors, 1))
+    run(spark, f"silver enrichment (salted x{args.salt_buckets})",
+        silver_enrichment(events, shipments, stores, vendors, args.salt_buckets))
+    with session_conf(spark, {**SKEW_SPARK_CONF, "spark.sql.adaptive.coalescePartitions.enabled": "false"}):
+        run(spark, "silver enrichment (adaptive skew join)", silver_enrichment(events, shipments, stores, vendors, 1))
+
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()